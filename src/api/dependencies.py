@@ -1,20 +1,76 @@
-import os
+import asyncio
+import time
 from typing import Optional
 from storage.google_auth import GoogleAuthStore
 from storage.durable_queue import DurableQueue
+from integration.calendar_integration import CalendarIntegration
 from energy.policy import EnergyPolicy
+from energy.price_signal import EnergyStatus, afetch_energy_status, fetch_energy_status
 from api import state
-
-# Configuration
-ENERGY_PRICE_THRESHOLD_EUR = float(os.getenv("ENERGY_PRICE_THRESHOLD_EUR", "0.70"))
-ENERGY_FAIL_OPEN = os.getenv("ENERGY_FAIL_OPEN", "true").lower() in {"1", "true", "yes"}
+from api.settings import settings
 
 policy = EnergyPolicy(
-    price_threshold_eur=ENERGY_PRICE_THRESHOLD_EUR,
-    fail_open=ENERGY_FAIL_OPEN,
+    price_threshold_eur=settings.energy_price_threshold_eur,
+    fail_open=settings.energy_fail_open,
 )
 
 
+class _EnergyCache:
+    """Last fetched energy status, shared by all requests and workers."""
+
+    def __init__(self):
+        self.value: Optional[EnergyStatus] = None
+        self.expires_at = 0.0
+        self.lock = asyncio.Lock()
+
+
+_energy_cache = _EnergyCache()
+
+
+async def get_energy_status() -> Optional[EnergyStatus]:
+    """
+    Current energy status, fetched at most once per ENERGY_STATUS_TTL seconds.
+
+    Concurrent misses wait on the same lock, so only one of them fetches.
+    A failed fetch (None) is cached too, so an unreachable signal does not
+    cost every request its timeout.
+    """
+    if not settings.energy_status_url:
+        return None
+
+    cache = _energy_cache
+    if time.monotonic() < cache.expires_at:
+        return cache.value
+
+    async with cache.lock:
+        if time.monotonic() < cache.expires_at:
+            return cache.value
+        return await _fetch_energy_status_locked()
+
+
+async def refresh_energy_status() -> Optional[EnergyStatus]:
+    """Fetch the energy status now and restart its TTL (background prefetch)."""
+    if not settings.energy_status_url:
+        return None
+
+    async with _energy_cache.lock:
+        return await _fetch_energy_status_locked()
+
+
+async def _fetch_energy_status_locked() -> Optional[EnergyStatus]:
+    cache = _energy_cache
+    if state.http_client is not None:
+        cache.value = await afetch_energy_status(
+            state.http_client, settings.energy_status_url, 1.0
+        )
+    else:
+        cache.value = await asyncio.to_thread(
+            fetch_energy_status, settings.energy_status_url, 1.0
+        )
+    cache.expires_at = time.monotonic() + settings.energy_status_ttl
+    return cache.value
+
+
 def get_google_auth_store() -> Optional[GoogleAuthStore]:
     return state.google_auth_store
 
@@ -25,3 +81,28 @@ def get_durable_queue() -> Optional[DurableQueue]:
 
 def get_energy_policy() -> EnergyPolicy:
     return policy
+
+
+async def run_calendar_call(fn, *args):
+    """Run a blocking Google Calendar call on the dedicated calendar threads."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(state.calendar_executor, fn, *args)
+
+
+def get_calendar_integration(
+    credentials, user_id: str = "default"
+) -> CalendarIntegration:
+    """
+    Return the shared CalendarIntegration for a user's credentials.
+
+    The integration (and the Google API client it builds) is kept across
+    requests as long as the user's stored refresh token stays the same; its
+    credentials refresh the access token in place when it expires.
+    """
+    key = credentials.refresh_token or credentials.token
+    cached = state.calendar_integrations.get(user_id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    integration = CalendarIntegration(credentials=credentials)
+    state.calendar_integrations[user_id] = (key, integration)
+    return integration
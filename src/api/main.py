@@ -1,14 +1,24 @@
 import asyncio
 import logging
-import os
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor
 
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 
 from api import state
-from api.workers import _durable_queue_worker, _stale_recovery_worker, _queue_worker
+from api.settings import settings
+from api.workers import (
+    _calendar_sync_worker,
+    _durable_queue_worker,
+    _energy_refresh_worker,
+    _queue_worker,
+    _stale_recovery_worker,
+)
 from storage import db
 from storage.durable_queue import DurableQueue
 from storage.google_auth import GoogleAuthStore
@@ -34,12 +44,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration
-USE_DURABLE_QUEUE = os.getenv("USE_DURABLE_QUEUE", "true").lower() in {
-    "1",
-    "true",
-    "yes",
-}
+# Compress larger JSON bodies (queue listings, multi-day schedules)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Include Routers
 app.include_router(auth.router)
@@ -53,13 +59,32 @@ app.include_router(ops.router)
 
 @app.on_event("startup")
 async def startup() -> None:
+    # Shared HTTP client for the energy signal
+    state.http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+
+    # Keep the energy status warm off the request path
+    if settings.energy_status_url and settings.energy_status_prefetch:
+        asyncio.create_task(_energy_refresh_worker())
+
+    # Optional worker processes for CPU-bound notes processing. Spawned (not
+    # forked) so children do not inherit the running event loop and threads.
+    if settings.notes_process_workers > 0:
+        state.process_pool = ProcessPoolExecutor(
+            max_workers=settings.notes_process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
     # Initialize DB connection
     await db.init_db_pool()
     await db.init_schema()
 
     # Initialize Durable Queue
-    if USE_DURABLE_QUEUE:
-        state.durable_queue = DurableQueue()
+    if settings.use_durable_queue:
+        state.durable_queue = DurableQueue(
+            pending_count_ttl_s=settings.pending_count_ttl_s
+        )
         # Start background workers...
         asyncio.create_task(_durable_queue_worker())
         asyncio.create_task(_stale_recovery_worker())
@@ -69,11 +94,14 @@ async def startup() -> None:
 
     # Initialize Google Auth Store
     state.google_auth_store = GoogleAuthStore()
+    asyncio.create_task(_calendar_sync_worker())
 
-    # Start CodeCarbon tracking if not already started
+    # Start CodeCarbon tracking (ENABLE_EMISSIONS_TRACKING)
     try:
-        state.tracker.start()
-        logger.info("CodeCarbon tracker started")
+        tracker = state.get_tracker()
+        if tracker is not None:
+            tracker.start()
+            logger.info("CodeCarbon tracker started")
     except Exception as e:
         logger.error(f"Failed to start CodeCarbon tracker: {e}")
 
@@ -84,14 +112,25 @@ async def shutdown() -> None:
     logger.info("Shutting down...")
 
     # Stop CodeCarbon
-    try:
-        state.tracker.stop()
-        time.sleep(5)  # Allow HTTP push to complete
-        logger.info("CodeCarbon metrics pushed successfully")
-    except Exception as e:
-        logger.error(f"Error stopping CodeCarbon tracker: {e}")
+    if state.tracker is not None:
+        try:
+            state.tracker.stop()
+            time.sleep(5)  # Allow HTTP push to complete
+            logger.info("CodeCarbon metrics pushed successfully")
+        except Exception as e:
+            logger.error(f"Error stopping CodeCarbon tracker: {e}")
+
+    if state.http_client is not None:
+        await state.http_client.aclose()
+        state.http_client = None
+
+    if state.process_pool is not None:
+        state.process_pool.shutdown(wait=False, cancel_futures=True)
+        state.process_pool = None
+
+    state.calendar_executor.shutdown(wait=False)
 
-    if USE_DURABLE_QUEUE:
+    if settings.use_durable_queue:
         try:
             await db.close_db_pool()
             logger.info("Database pool closed")
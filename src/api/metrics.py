@@ -1,4 +1,13 @@
-from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, REGISTRY
+from prometheus_client import (
+    Counter,
+    Histogram,
+    Gauge,
+    REGISTRY,
+    disable_created_metrics,
+)
+
+# Nothing consumes the extra *_created series; skip exporting them
+disable_created_metrics()
 
 
 # we check if they are already registered to avoid errors during hot reloads or test runs
@@ -40,3 +49,36 @@ LLM_TIER_TOTAL = get_or_create_metric(
 QUEUE_DEPTH = get_or_create_metric(
     "planner_queue_depth", "Current items in queue", Gauge
 )
+
+
+# Label values are limited to these fixed sets so a new code path cannot
+# mint an unbounded number of series; unknown LLM tiers are recorded as "other".
+# Extend the sets here when adding an instrumented endpoint or LLM tier.
+OTHER = "other"
+ALLOWED_ENDPOINTS = ("/notes",)
+ALLOWED_STATUSES = ("processed", "queued")
+ALLOWED_TIERS = ("large", "small")  # EnergyPolicy.llm_tier
+
+# Pre-bound children for every allowed label combination. .labels() hashes
+# the label values and takes a lock on each call; these handles skip that.
+# Instrumented code binds its children from these dicts. The "other" tier
+# child is only bound on first use, so no idle zero-valued series is exported.
+REQUEST_COUNTERS = {
+    (endpoint, status): REQUESTS_TOTAL.labels(endpoint=endpoint, status=status)
+    for endpoint in ALLOWED_ENDPOINTS
+    for status in ALLOWED_STATUSES
+}
+REQUEST_LATENCIES = {
+    endpoint: REQUEST_LATENCY_SECONDS.labels(endpoint=endpoint)
+    for endpoint in ALLOWED_ENDPOINTS
+}
+_LLM_TIERS = {tier: LLM_TIER_TOTAL.labels(tier=tier) for tier in ALLOWED_TIERS}
+
+
+def count_llm_tier(tier: str) -> None:
+    child = _LLM_TIERS.get(tier)
+    if child is None:
+        child = _LLM_TIERS.get(OTHER)
+        if child is None:
+            child = _LLM_TIERS[OTHER] = LLM_TIER_TOTAL.labels(tier=OTHER)
+    child.inc()
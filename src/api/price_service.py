@@ -1,27 +1,40 @@
 
 import math
 import time
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 
 app = FastAPI()
 
+# Last computed status, reused for up to one second: (computed_at, payload)
+_CACHE_TTL_S = 1.0
+_cache: tuple[float, dict] = (0.0, {})
+
 class EnergyStatus(BaseModel):
     electricity_price_eur: float
     solar_available: int
 
 @app.get("/")
-def get_status():
-    # Simulate varying price
+def get_status(response: Response):
+    global _cache
+
+    response.headers["Cache-Control"] = "max-age=1"
+
     t = time.time()
+    if t - _cache[0] < _CACHE_TTL_S:
+        return _cache[1]
+
+    # Simulate varying price
     variation = math.sin(t / 10.0) 
     price = 0.50 + (0.40 * variation)
     solar = 1 if price < 0.40 else 0
     
-    return {
+    payload = {
         "electricity_price_eur": round(price, 2),
         "solar_available": solar
     }
+    _cache = (t, payload)
+    return payload
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,33 @@
+import functools
+from dataclasses import asdict
+from typing import Any, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from energy.price_signal import EnergyStatus
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Return it directly from a route to skip FastAPI's jsonable_encoder pass;
+    orjson serializes datetimes and dataclasses natively. Anything it does
+    not know falls back to jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+# EnergyStatus is frozen (hashable) and the TTL cache hands out the same
+# instance between fetches, so this is converted once per fetch.
+# The returned dict is shared: do not mutate it.
+@functools.lru_cache(maxsize=16)
+def serialize_status(status: Optional[EnergyStatus]) -> Optional[dict]:
+    """The energy status as a dict for response bodies."""
+    return asdict(status) if status is not None else None
@@ -1,20 +1,16 @@
-import os
+import asyncio
 import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Response
 from google_auth_oauthlib.flow import Flow
 from storage.google_auth import GoogleAuthStore
+from api import state
+from api.settings import settings
 from api.dependencies import get_google_auth_store
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Google Auth Configuration
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
-GOOGLE_REDIRECT_URI = os.getenv(
-    "GOOGLE_REDIRECT_URI", "http://localhost:8000/auth/google/callback"
-)
 DEFAULT_USER_ID = "default"
 
 
@@ -24,14 +20,14 @@ async def google_login():
     if not Flow:
         raise HTTPException(status_code=501, detail="Google Auth not configured")
 
-    if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
+    if not settings.google_client_id or not settings.google_client_secret:
         raise HTTPException(status_code=500, detail="Google credentials not configured")
 
     flow = Flow.from_client_config(
         {
             "web": {
-                "client_id": GOOGLE_CLIENT_ID,
-                "client_secret": GOOGLE_CLIENT_SECRET,
+                "client_id": settings.google_client_id,
+                "client_secret": settings.google_client_secret,
                 "auth_uri": "https://accounts.google.com/o/oauth2/auth",
                 "token_uri": "https://oauth2.googleapis.com/token",
             }
@@ -42,7 +38,7 @@ async def google_login():
             "https://www.googleapis.com/auth/calendar.readonly",
             "https://www.googleapis.com/auth/userinfo.email",
         ],
-        redirect_uri=GOOGLE_REDIRECT_URI,
+        redirect_uri=settings.google_redirect_uri,
     )
 
     authorization_url, state = flow.authorization_url(
@@ -79,8 +75,8 @@ async def google_callback(
         flow = Flow.from_client_config(
             {
                 "web": {
-                    "client_id": GOOGLE_CLIENT_ID,
-                    "client_secret": GOOGLE_CLIENT_SECRET,
+                    "client_id": settings.google_client_id,
+                    "client_secret": settings.google_client_secret,
                     "auth_uri": "https://accounts.google.com/o/oauth2/auth",
                     "token_uri": "https://oauth2.googleapis.com/token",
                 }
@@ -91,18 +87,17 @@ async def google_callback(
                 "https://www.googleapis.com/auth/calendar.readonly",
                 "https://www.googleapis.com/auth/userinfo.email",
             ],
-            redirect_uri=GOOGLE_REDIRECT_URI,
+            redirect_uri=settings.google_redirect_uri,
         )
 
-        flow.fetch_token(code=code)
+        # Token exchange and userinfo are blocking HTTPS calls; keep them off the loop
+        await asyncio.to_thread(flow.fetch_token, code=code)
 
         credentials = flow.credentials
 
         # Get user email
         try:
-            session = flow.authorized_session()
-            user_info = session.get("https://www.googleapis.com/userinfo/v2/me").json()
-            email = user_info.get("email")
+            email = await asyncio.to_thread(_fetch_user_email, flow)
         except Exception as e:
             logger.error(f"Failed to fetch user email: {e}")
             email = None
@@ -129,6 +124,13 @@ async def google_callback(
         )
 
 
+def _fetch_user_email(flow: Flow) -> Optional[str]:
+    """Email of the user who just authorized the flow (blocking)."""
+    session = flow.authorized_session()
+    user_info = session.get("https://www.googleapis.com/userinfo/v2/me").json()
+    return user_info.get("email")
+
+
 @router.get("/auth/google/status")
 async def google_status(
     google_auth_store: Optional[GoogleAuthStore] = Depends(get_google_auth_store),
@@ -156,6 +158,8 @@ async def google_disconnect(
 
     try:
         await google_auth_store.delete_credentials(DEFAULT_USER_ID)
+        state.calendar_integrations.pop(DEFAULT_USER_ID, None)
+        state.invalidate_events_cache()
         return {"status": "disconnected"}
     except Exception as e:
         logger.error(f"Error disconnecting: {e}")
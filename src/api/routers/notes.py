@@ -1,85 +1,96 @@
 import asyncio
+import functools
 import logging
 import time
-import os
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException
-from prometheus_client import Counter, Histogram, Gauge
+from fastapi import APIRouter, Depends
 
 from api.backend import BackendAPI
 from api import state
-from api.dependencies import get_durable_queue, get_google_auth_store, get_energy_policy
+from api.settings import settings
+from api.dependencies import (
+    get_durable_queue,
+    get_energy_policy,
+    get_energy_status,
+    get_google_auth_store,
+)
+from api.responses import ORJSONResponse, serialize_status
 from api.metrics import (
-    REQUESTS_TOTAL,
-    REQUEST_LATENCY_SECONDS,
+    count_llm_tier,
+    REQUEST_COUNTERS,
+    REQUEST_LATENCIES,
     TASKS_EXTRACTED_TOTAL,
     TASKS_SCHEDULED_TOTAL,
-    LLM_TIER_TOTAL,
     QUEUE_DEPTH,
 )
 from energy.policy import EnergyPolicy
-from energy.price_signal import EnergyStatus, fetch_energy_status
+from energy.price_signal import EnergyStatus
 from storage.durable_queue import DurableQueue
 from storage.google_auth import GoogleAuthStore
-from integration.calendar_integration import CalendarIntegration
 from planner_ai.models import ScheduledTask
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 backend = BackendAPI()
 
+# Metric children for this endpoint, pre-bound in api.metrics
+NOTES_PROCESSED = REQUEST_COUNTERS[("/notes", "processed")]
+NOTES_QUEUED = REQUEST_COUNTERS[("/notes", "queued")]
+NOTES_LATENCY = REQUEST_LATENCIES["/notes"]
+
 # Config
-ENERGY_STATUS_URL = os.getenv("ENERGY_STATUS_URL", "").strip()
 DEFAULT_USER_ID = "default"
-USE_DURABLE_QUEUE = os.getenv("USE_DURABLE_QUEUE", "true").lower() in {
-    "1",
-    "true",
-    "yes",
-}
 
 
 class NotesIn(BaseModel):
     notes: str
 
 
-def _serialize_status(status: Optional[EnergyStatus]) -> Optional[dict]:
-    from dataclasses import asdict
-
-    return asdict(status) if status is not None else None
+def _fmt_hhmm(value):
+    """HH:MM of a datetime or ISO datetime string; anything else is returned as is."""
+    if hasattr(value, "strftime"):
+        return value.strftime("%H:%M")
+    if isinstance(value, str) and len(value) >= 16 and value[10] == "T":
+        return value[11:16]
+    return value
 
 
-async def _get_energy_status() -> Optional[EnergyStatus]:
-    if not ENERGY_STATUS_URL:
-        return None
-    return await asyncio.to_thread(fetch_energy_status, ENERGY_STATUS_URL, 1.0)
+def _to_dt(value):
+    """Parse ISO datetime strings; datetimes (and None) pass through."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
 
 
 async def _process_notes(notes: str, llm_tier: str) -> dict:
     # Note: backend.submit_notes accepts llm_tier as a keyword argument,
     # but we need to pass it correctly via asyncio.to_thread
+    if state.process_pool is not None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            state.process_pool,
+            functools.partial(backend.submit_notes, notes, llm_tier=llm_tier),
+        )
     return await asyncio.to_thread(backend.submit_notes, notes, llm_tier=llm_tier)
 
 
-@router.post("/notes")
+@router.post("/notes", response_class=ORJSONResponse)
 async def submit_notes(
     payload: NotesIn,
     durable_queue: Optional[DurableQueue] = Depends(get_durable_queue),
     google_auth_store: Optional[GoogleAuthStore] = Depends(get_google_auth_store),
     policy: EnergyPolicy = Depends(get_energy_policy),
-) -> dict:
-    start = time.time()
+    status: Optional[EnergyStatus] = Depends(get_energy_status),
+) -> ORJSONResponse:
+    start = time.perf_counter()
     logger.info(f"Received notes submission: {payload.notes[:50]}...")
 
-    status = await _get_energy_status()
     llm_tier = policy.llm_tier(status)
 
-    # Count which LLM tier was selected for this request (best-effort)
-    try:
-        LLM_TIER_TOTAL.labels(tier=llm_tier).inc()
-    except Exception:
-        pass
+    # Count which LLM tier was selected for this request (pre-bound child)
+    count_llm_tier(llm_tier)
 
     if policy.should_process_now(status):
         logger.info(f"Processing notes immediately (Tier: {llm_tier})")
@@ -98,169 +109,164 @@ async def submit_notes(
         tasks_out = result.get("tasks", []) or []
         schedule_out = result.get("schedule", []) or []
 
+        now = datetime.now()
         if tasks_out:
+            created_at = now.isoformat()
             for task in tasks_out:
-                task["created_at"] = datetime.now().isoformat()
-                state.recent_tasks.appendleft(task)
+                task["created_at"] = created_at
+            # Same order as appendleft per task: newest (last) first
+            state.recent_tasks.extendleft(tasks_out)
 
         if schedule_out:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            # Convert schedule list to format expected by frontend
-            slots = []
-            for s in schedule_out:
-                start_time = s.get("start_time", "")
-                end_time = s.get("end_time", "")
-                # Handle datetime objects or ISO strings
-                if hasattr(start_time, "strftime"):
-                    start_time = start_time.strftime("%H:%M")
-                elif isinstance(start_time, str) and "T" in start_time:
-                    start_time = start_time.split("T")[1][:5]
-                if hasattr(end_time, "strftime"):
-                    end_time = end_time.strftime("%H:%M")
-                elif isinstance(end_time, str) and "T" in end_time:
-                    end_time = end_time.split("T")[1][:5]
-                slots.append(
-                    {
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "task": {
-                            "title": s.get("title", "Task"),
-                            "category": s.get("category", "work"),
-                            "priority": s.get("priority", 3),
-                            "estimated_duration": s.get("estimated_duration_min", 30),
-                        },
-                    }
-                )
-            state.recent_schedules[date_str] = {"slots": slots}
-            logger.info(f"Stored schedule with {len(slots)} slots for {date_str}")
+            date_str = now.strftime("%Y-%m-%d")
 
-            # Sync to Google Calendar if possible
-            if schedule_out and google_auth_store:
+            credentials = None
+            if google_auth_store:
                 try:
                     credentials = await google_auth_store.get_credentials(
                         DEFAULT_USER_ID
                     )
-                    if credentials:
-                        logger.info(
-                            "Syncing schedule to Google Calendar (Immediate Mode)..."
-                        )
+                except Exception as e:
+                    logger.error(f"Failed to auto-sync to calendar: {e}")
+
+            # One pass builds the frontend slots and, when the calendar is
+            # connected, the ScheduledTask objects to sync
+            slots = []
+            task_objects = []
+            for item in schedule_out:
+                s_time = item.get("start_time", "")
+                e_time = item.get("end_time", "")
+                title = item.get("title", "Task")
+                category = item.get("category", "work")
+                priority = item.get("priority", 3)
+                duration = item.get("estimated_duration_min", 30)
+
+                slots.append(
+                    state.Slot(
+                        start_time=_fmt_hhmm(s_time),
+                        end_time=_fmt_hhmm(e_time),
+                        title=title,
+                        category=category,
+                        priority=priority,
+                        estimated_duration=duration,
+                    )
+                )
 
-                        task_objects = []
-                        for item in schedule_out:
-                            try:
-                                s_time = item.get("start_time")
-                                e_time = item.get("end_time")
-
-                                # Handle string to datetime conversion
-                                if isinstance(s_time, str):
-                                    s_time = datetime.fromisoformat(s_time)
-                                if isinstance(e_time, str):
-                                    e_time = datetime.fromisoformat(e_time)
-
-                                t = ScheduledTask(
-                                    title=item.get("title", "Untitled"),
-                                    description=item.get("description"),
-                                    category=item.get("category"),
-                                    priority=item.get("priority", 3),
-                                    estimated_duration_min=item.get(
-                                        "estimated_duration_min", 30
-                                    ),
-                                    start_time=s_time,
-                                    end_time=e_time,
-                                )
-                                task_objects.append(t)
-                            except Exception as e:
-                                logger.warning(
-                                    f"Skipping task for sync due to parse error: {e}"
-                                )
-
-                        cal_integration = CalendarIntegration(credentials=credentials)
-                        synced_tasks = await asyncio.to_thread(
-                            cal_integration.sync, task_objects
+                if credentials:
+                    try:
+                        # Same defaults as the durable worker's sync path,
+                        # which differ from the slot defaults above
+                        task_objects.append(
+                            ScheduledTask(
+                                title=item.get("title", "Untitled"),
+                                description=item.get("description"),
+                                category=item.get("category"),
+                                priority=priority,
+                                estimated_duration_min=duration,
+                                start_time=_to_dt(item.get("start_time")),
+                                end_time=_to_dt(item.get("end_time")),
+                            )
                         )
-                        logger.info(
-                            f"Synced {len(synced_tasks)} tasks to Google Calendar"
+                    except Exception as e:
+                        logger.warning(
+                            f"Skipping task for sync due to parse error: {e}"
                         )
-                except Exception as e:
-                    logger.error(f"Failed to auto-sync to calendar: {e}")
+
+            state.set_day_slots(date_str, slots)
+            logger.info(f"Stored schedule with {len(slots)} slots for {date_str}")
+
+            # Hand off to the calendar sync worker; the response does not
+            # wait for Google Calendar. The notes are already processed and
+            # stored, so a full backlog dead-letters the overflow rather than
+            # failing the request.
+            dead = state.enqueue_calendar_sync_or_dead_letter(task_objects)
+            if dead:
+                logger.error(f"Calendar sync backlog full: dead-lettered {dead} tasks")
+            if task_objects:
+                logger.info(
+                    f"Queued {len(task_objects) - dead} tasks for Google Calendar sync"
+                )
 
         # Prometheus counters (best-effort)
 
         try:
-            REQUESTS_TOTAL.labels(endpoint="/notes", status="processed").inc()
-            REQUEST_LATENCY_SECONDS.labels(endpoint="/notes").observe(
-                time.time() - start
-            )
+            NOTES_PROCESSED.inc()
+            NOTES_LATENCY.observe(time.perf_counter() - start)
             TASKS_EXTRACTED_TOTAL.inc(len(tasks_out))
             TASKS_SCHEDULED_TOTAL.inc(len(schedule_out))
 
-            # Queue depth gauge (durable vs in-memory)
-            if USE_DURABLE_QUEUE and durable_queue is not None:
-                QUEUE_DEPTH.set(await durable_queue.get_pending_count())
-            else:
+            # Queue depth gauge. Processing immediately does not change the
+            # durable queue, and /metrics refreshes that count on every scrape.
+            if not (settings.use_durable_queue and durable_queue is not None):
                 QUEUE_DEPTH.set(state.notes_queue.qsize())
         except Exception:
             pass
 
         # Force update of carbon metrics (best-effort)
         try:
-            if hasattr(state.tracker, "flush"):
-                state.tracker.flush()
+            if state.tracker_flush is not None:
+                state.tracker_flush()
         except Exception:
             pass
 
-        return {
-            "status": "processed",
-            "llm_tier": llm_tier,
-            "energy": _serialize_status(status),
-            **result,
-        }
+        # The result holds model_dump() output; orjson handles its datetimes
+        return ORJSONResponse(
+            {
+                "status": "processed",
+                "llm_tier": llm_tier,
+                "energy": serialize_status(status),
+                **result,
+            }
+        )
 
     # Queue the notes for later processing
-    if USE_DURABLE_QUEUE and durable_queue is not None:
+    if settings.use_durable_queue and durable_queue is not None:
         # Use durable PostgreSQL-backed queue
-        item_id = await durable_queue.enqueue(
+        item_id, pending_count = await durable_queue.enqueue_and_count(
             notes=payload.notes,
             energy_price_eur=status.electricity_price_eur if status else None,
             solar_available=status.solar_available if status else None,
             llm_tier=llm_tier,
         )
-        pending_count = await durable_queue.get_pending_count()
+        await state.notify_queue()
 
         # Prometheus counters (best-effort)
         try:
-            REQUESTS_TOTAL.labels(endpoint="/notes", status="queued").inc()
-            REQUEST_LATENCY_SECONDS.labels(endpoint="/notes").observe(
-                time.time() - start
-            )
+            NOTES_QUEUED.inc()
+            NOTES_LATENCY.observe(time.perf_counter() - start)
             QUEUE_DEPTH.set(pending_count)
         except Exception:
             pass
 
-        return {
-            "status": "queued",
-            "queue_item_id": item_id,
-            "llm_tier": llm_tier,
-            "queue_size": pending_count,
-            "queue_type": "durable",
-            "energy": _serialize_status(status),
-        }
+        return ORJSONResponse(
+            {
+                "status": "queued",
+                "queue_item_id": item_id,
+                "llm_tier": llm_tier,
+                "queue_size": pending_count,
+                "queue_type": "durable",
+                "energy": serialize_status(status),
+            }
+        )
 
     # Fallback to in-memory queue
     await state.notes_queue.put(payload.notes)
+    await state.notify_queue()
 
     # Prometheus counters (best-effort)
     try:
-        REQUESTS_TOTAL.labels(endpoint="/notes", status="queued").inc()
-        REQUEST_LATENCY_SECONDS.labels(endpoint="/notes").observe(time.time() - start)
+        NOTES_QUEUED.inc()
+        NOTES_LATENCY.observe(time.perf_counter() - start)
         QUEUE_DEPTH.set(state.notes_queue.qsize())
     except Exception:
         pass
 
-    return {
-        "status": "queued",
-        "llm_tier": llm_tier,
-        "queue_size": state.notes_queue.qsize(),
-        "queue_type": "in-memory",
-        "energy": _serialize_status(status),
-    }
+    return ORJSONResponse(
+        {
+            "status": "queued",
+            "llm_tier": llm_tier,
+            "queue_size": state.notes_queue.qsize(),
+            "queue_type": "in-memory",
+            "energy": serialize_status(status),
+        }
+    )
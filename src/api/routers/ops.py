@@ -1,4 +1,4 @@
-import os
+import asyncio
 import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, Response
@@ -6,6 +6,7 @@ from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from api.metrics import QUEUE_DEPTH
 
 from api import state
+from api.settings import settings
 from api.dependencies import get_durable_queue
 from storage import db
 from storage.durable_queue import DurableQueue
@@ -13,13 +14,6 @@ from storage.durable_queue import DurableQueue
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Config
-USE_DURABLE_QUEUE = os.getenv("USE_DURABLE_QUEUE", "true").lower() in {
-    "1",
-    "true",
-    "yes",
-}
-
 
 @router.get("/health")
 async def health_check(
@@ -28,11 +22,11 @@ async def health_check(
     """Health check endpoint for container orchestration."""
     health = {
         "status": "healthy",
-        "profile": os.getenv("DEPLOYMENT_PROFILE", "unknown"),
-        "queue_type": "durable" if USE_DURABLE_QUEUE and durable_queue else "in-memory",
+        "profile": settings.deployment_profile,
+        "queue_type": "durable" if settings.use_durable_queue and durable_queue else "in-memory",
     }
 
-    if USE_DURABLE_QUEUE and durable_queue is not None:
+    if settings.use_durable_queue and durable_queue is not None:
         try:
             db_health = await db.health_check()
             health["database"] = db_health
@@ -46,6 +40,8 @@ async def health_check(
     else:
         health["queue_size"] = state.notes_queue.qsize()
 
+    health["calendar_sync_pending"] = state.calendar_sync_queue.qsize()
+    health["calendar_sync_dead_letter"] = len(state.calendar_sync_dead_letter)
     return health
 
 
@@ -57,7 +53,7 @@ async def metrics(
     Prometheus scrape endpoint.
     """
     try:
-        if USE_DURABLE_QUEUE and durable_queue is not None:
+        if settings.use_durable_queue and durable_queue is not None:
             # Gauge.set is synchronous but get_pending_count is async.
             # We must await it first.
             count = await durable_queue.get_pending_count()
@@ -67,7 +63,8 @@ async def metrics(
     except Exception:
         pass
 
-    data = generate_latest()
+    # Walking and rendering the registry is CPU work; keep it off the event loop
+    data = await asyncio.to_thread(generate_latest)
     return Response(content=data, media_type=CONTENT_TYPE_LATEST)
 
 
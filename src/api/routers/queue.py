@@ -1,46 +1,83 @@
-import os
 import asyncio
 import logging
-from typing import Optional
-from dataclasses import asdict
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator, Callable, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from api import state
-from api.dependencies import get_durable_queue, get_energy_policy
+from api.settings import settings
+from api.dependencies import get_durable_queue, get_energy_policy, get_energy_status
+from api.responses import ORJSONResponse, serialize_status
 from energy.policy import EnergyPolicy
-from energy.price_signal import EnergyStatus, fetch_energy_status
-from storage.durable_queue import DurableQueue
+from energy.price_signal import EnergyStatus
+from storage.durable_queue import DurableQueue, QueueItem
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Config
-ENERGY_STATUS_URL = os.getenv("ENERGY_STATUS_URL", "").strip()
-USE_DURABLE_QUEUE = os.getenv("USE_DURABLE_QUEUE", "true").lower() in {
-    "1",
-    "true",
-    "yes",
-}
+# Listings asking for more items than this are streamed
+STREAM_ITEMS_MIN_LIMIT = 200
 
 
-def _serialize_status(status: Optional[EnergyStatus]) -> Optional[dict]:
-    return asdict(status) if status is not None else None
+def _truncate_notes(notes: str) -> str:
+    return notes[:100] + "..." if len(notes) > 100 else notes
 
 
-async def _get_energy_status() -> Optional[EnergyStatus]:
-    if not ENERGY_STATUS_URL:
-        return None
-    return await asyncio.to_thread(fetch_energy_status, ENERGY_STATUS_URL, 1.0)
+def _serialize_item(item: QueueItem) -> dict:
+    return {
+        "id": item.id,
+        "notes": _truncate_notes(item.notes),
+        "status": item.status,
+        "attempts": item.attempts,
+        "max_attempts": item.max_attempts,
+        "last_error": item.last_error,
+        "created_at": item.created_at,
+        "completed_at": item.completed_at,
+        "submitted_llm_tier": item.submitted_llm_tier,
+        "processed_llm_tier": item.processed_llm_tier,
+    }
+
+
+def _serialize_dead_item(item: QueueItem) -> dict:
+    return {
+        "id": item.id,
+        "notes": _truncate_notes(item.notes),
+        "attempts": item.attempts,
+        "last_error": item.last_error,
+        "created_at": item.created_at,
+    }
+
+
+def _serialize_items(items: list[QueueItem]) -> list[dict]:
+    return [_serialize_item(item) for item in items]
+
+
+def _serialize_dead_items(items: list[QueueItem]) -> list[dict]:
+    return [_serialize_dead_item(item) for item in items]
+
+
+async def _stream_items(
+    items: AsyncIterator[QueueItem], serialize: Callable[[QueueItem], dict]
+) -> AsyncIterator[bytes]:
+    """Emit {"items": [...], "count": n} one item at a time."""
+    count = 0
+    yield b'{"items":['
+    async for item in items:
+        if count:
+            yield b","
+        yield orjson.dumps(serialize(item))
+        count += 1
+    yield b'],"count":%d}' % count
 
 
 @router.get("")
 async def queue_status(
     durable_queue: Optional[DurableQueue] = Depends(get_durable_queue),
     policy: EnergyPolicy = Depends(get_energy_policy),
+    status: Optional[EnergyStatus] = Depends(get_energy_status),
 ) -> dict:
     """Get queue status and energy information."""
-    status = await _get_energy_status()
-
-    if USE_DURABLE_QUEUE and durable_queue is not None:
+    if settings.use_durable_queue and durable_queue is not None:
         try:
             stats = await durable_queue.get_stats()
             return {
@@ -53,7 +90,7 @@ async def queue_status(
                 "total": stats["total"],
                 "process_now": policy.should_process_now(status),
                 "llm_tier": policy.llm_tier(status),
-                "energy": _serialize_status(status),
+                "energy": serialize_status(status),
             }
         except Exception as e:
             logger.error(f"Error getting queue stats: {e}")
@@ -62,7 +99,7 @@ async def queue_status(
                 "error": str(e),
                 "process_now": policy.should_process_now(status),
                 "llm_tier": policy.llm_tier(status),
-                "energy": _serialize_status(status),
+                "energy": serialize_status(status),
             }
     else:
         return {
@@ -70,16 +107,16 @@ async def queue_status(
             "queue_size": state.notes_queue.qsize(),
             "process_now": policy.should_process_now(status),
             "llm_tier": policy.llm_tier(status),
-            "energy": _serialize_status(status),
+            "energy": serialize_status(status),
         }
 
 
-@router.get("/items")
+@router.get("/items", response_class=ORJSONResponse)
 async def get_queue_items(
     limit: int = 20,
     status: Optional[str] = None,
     durable_queue: Optional[DurableQueue] = Depends(get_durable_queue),
-) -> dict:
+) -> Response:
     """
     Get recent queue items.
 
@@ -87,38 +124,28 @@ async def get_queue_items(
         limit: Maximum number of items to return (default 20)
         status: Filter by status (pending, processing, completed, failed, dead)
     """
-    if not USE_DURABLE_QUEUE or durable_queue is None:
+    if not settings.use_durable_queue or durable_queue is None:
         raise HTTPException(
             status_code=400,
             detail="Durable queue not enabled. Set USE_DURABLE_QUEUE=true",
         )
 
+    if limit > STREAM_ITEMS_MIN_LIMIT:
+        # Big listings are streamed from a cursor instead of built in memory.
+        # Errors past this point can only cut the stream short.
+        return StreamingResponse(
+            _stream_items(
+                durable_queue.iter_recent_items(limit=limit, status=status),
+                _serialize_item,
+            ),
+            media_type="application/json",
+        )
+
     try:
         items = await durable_queue.get_recent_items(limit=limit, status=status)
-        return {
-            "items": [
-                {
-                    "id": item.id,
-                    "notes": item.notes[:100] + "..."
-                    if len(item.notes) > 100
-                    else item.notes,
-                    "status": item.status,
-                    "attempts": item.attempts,
-                    "max_attempts": item.max_attempts,
-                    "last_error": item.last_error,
-                    "created_at": item.created_at.isoformat()
-                    if item.created_at
-                    else None,
-                    "completed_at": item.completed_at.isoformat()
-                    if item.completed_at
-                    else None,
-                    "submitted_llm_tier": item.submitted_llm_tier,
-                    "processed_llm_tier": item.processed_llm_tier,
-                }
-                for item in items
-            ],
-            "count": len(items),
-        }
+        # Large admin listings are pure CPU to shape; keep that off the event loop
+        serialized = await asyncio.to_thread(_serialize_items, items)
+        return ORJSONResponse({"items": serialized, "count": len(items)})
     except Exception as e:
         logger.error(f"Error getting queue items: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -127,43 +154,21 @@ async def get_queue_items(
 @router.get("/items/{item_id}")
 async def get_queue_item(
     item_id: str, durable_queue: Optional[DurableQueue] = Depends(get_durable_queue)
-) -> dict:
+) -> Response:
     """Get details of a specific queue item."""
-    if not USE_DURABLE_QUEUE or durable_queue is None:
+    if not settings.use_durable_queue or durable_queue is None:
         raise HTTPException(
             status_code=400,
             detail="Durable queue not enabled. Set USE_DURABLE_QUEUE=true",
         )
 
     try:
-        item = await durable_queue.get_item(item_id)
-        if item is None:
+        # PostgreSQL renders the row as JSON; pass it through untouched
+        item_json = await durable_queue.get_item_json(item_id)
+        if item_json is None:
             raise HTTPException(status_code=404, detail="Queue item not found")
 
-        return {
-            "id": item.id,
-            "notes": item.notes,
-            "status": item.status,
-            "attempts": item.attempts,
-            "max_attempts": item.max_attempts,
-            "last_error": item.last_error,
-            "submitted_energy_price_eur": item.submitted_energy_price_eur,
-            "submitted_solar_available": item.submitted_solar_available,
-            "submitted_llm_tier": item.submitted_llm_tier,
-            "processed_energy_price_eur": item.processed_energy_price_eur,
-            "processed_solar_available": item.processed_solar_available,
-            "processed_llm_tier": item.processed_llm_tier,
-            "created_at": item.created_at.isoformat() if item.created_at else None,
-            "updated_at": item.updated_at.isoformat() if item.updated_at else None,
-            "processing_started_at": item.processing_started_at.isoformat()
-            if item.processing_started_at
-            else None,
-            "completed_at": item.completed_at.isoformat()
-            if item.completed_at
-            else None,
-            "worker_id": item.worker_id,
-            "result": item.result,
-        }
+        return Response(content=item_json, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -171,36 +176,30 @@ async def get_queue_item(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/dead")
+@router.get("/dead", response_class=ORJSONResponse)
 async def get_dead_letter_items(
     limit: int = 50, durable_queue: Optional[DurableQueue] = Depends(get_durable_queue)
-) -> dict:
+) -> Response:
     """Get items in the dead letter queue (failed after max retries)."""
-    if not USE_DURABLE_QUEUE or durable_queue is None:
+    if not settings.use_durable_queue or durable_queue is None:
         raise HTTPException(
             status_code=400,
             detail="Durable queue not enabled. Set USE_DURABLE_QUEUE=true",
         )
 
+    if limit > STREAM_ITEMS_MIN_LIMIT:
+        return StreamingResponse(
+            _stream_items(
+                durable_queue.iter_recent_items(limit=limit, status="dead"),
+                _serialize_dead_item,
+            ),
+            media_type="application/json",
+        )
+
     try:
         items = await durable_queue.get_dead_letter_items(limit=limit)
-        return {
-            "items": [
-                {
-                    "id": item.id,
-                    "notes": item.notes[:100] + "..."
-                    if len(item.notes) > 100
-                    else item.notes,
-                    "attempts": item.attempts,
-                    "last_error": item.last_error,
-                    "created_at": item.created_at.isoformat()
-                    if item.created_at
-                    else None,
-                }
-                for item in items
-            ],
-            "count": len(items),
-        }
+        serialized = await asyncio.to_thread(_serialize_dead_items, items)
+        return ORJSONResponse({"items": serialized, "count": len(items)})
     except Exception as e:
         logger.error(f"Error getting dead letter items: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -211,7 +210,7 @@ async def retry_dead_item(
     item_id: str, durable_queue: Optional[DurableQueue] = Depends(get_durable_queue)
 ) -> dict:
     """Retry a dead letter item (reset to pending status)."""
-    if not USE_DURABLE_QUEUE or durable_queue is None:
+    if not settings.use_durable_queue or durable_queue is None:
         raise HTTPException(
             status_code=400,
             detail="Durable queue not enabled. Set USE_DURABLE_QUEUE=true",
@@ -223,6 +222,7 @@ async def retry_dead_item(
             raise HTTPException(
                 status_code=400, detail="Item not found or not in dead status"
             )
+        await state.notify_queue()
 
         return {
             "status": "success",
@@ -241,7 +241,7 @@ async def purge_completed_items(
     durable_queue: Optional[DurableQueue] = Depends(get_durable_queue),
 ) -> dict:
     """Purge completed items older than the specified hours."""
-    if not USE_DURABLE_QUEUE or durable_queue is None:
+    if not settings.use_durable_queue or durable_queue is None:
         raise HTTPException(
             status_code=400,
             detail="Durable queue not enabled. Set USE_DURABLE_QUEUE=true",
@@ -264,7 +264,7 @@ async def delete_queue_item(
     item_id: str, durable_queue: Optional[DurableQueue] = Depends(get_durable_queue)
 ):
     """Permanently remove a queue item."""
-    if not USE_DURABLE_QUEUE or durable_queue is None:
+    if not settings.use_durable_queue or durable_queue is None:
         raise HTTPException(status_code=400, detail="Durable Queue not enabled")
 
     deleted = await durable_queue.delete_item(item_id)
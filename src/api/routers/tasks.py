@@ -1,13 +1,20 @@
 import asyncio
 import logging
+from itertools import islice
+from time import monotonic
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException
 
 from api import state
-from api.dependencies import get_google_auth_store
-from integration.calendar_integration import CalendarIntegration
+from api.settings import settings
+from api.dependencies import (
+    get_calendar_integration,
+    get_google_auth_store,
+    run_calendar_call,
+)
+from api.responses import ORJSONResponse
 from storage.google_auth import GoogleAuthStore
 from planner_ai.models import ScheduledTask
 
@@ -16,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 # Constants
 DEFAULT_USER_ID = "default"
+_ONE_DAY = timedelta(days=1)
 
 
 class MoveRequestIn(BaseModel):
@@ -34,14 +42,40 @@ class CreateTaskIn(BaseModel):
     category: str = "work"
 
 
-@router.get("/tasks")
-async def get_tasks(limit: int = 20) -> dict:
+def _as_utc(iso: str) -> datetime:
+    """Aware datetime of an event time; floating (all-day) times are taken as UTC."""
+    dt = datetime.fromisoformat(iso)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def _stored_days(first_day: date, last_day: date) -> list[str]:
+    """Date keys in [first_day, last_day] that have a stored schedule, sorted."""
+    schedules = state.recent_schedules
+    if (last_day - first_day).days + 1 > len(schedules):
+        # Fewer stored days than requested ones: filter the store instead
+        first, last = first_day.isoformat(), last_day.isoformat()
+        return sorted(d for d in schedules if first <= d <= last)
+
+    days = []
+    day = first_day
+    while day <= last_day:
+        d_str = day.isoformat()
+        if d_str in schedules:
+            days.append(d_str)
+        day += _ONE_DAY
+    return days
+
+
+@router.get("/tasks", response_class=ORJSONResponse)
+async def get_tasks(limit: int = 20) -> ORJSONResponse:
     """Get recent extracted tasks."""
-    tasks_list = list(state.recent_tasks)[:limit]
-    return {
-        "tasks": tasks_list,
-        "total": len(state.recent_tasks),
-    }
+    tasks_list = list(islice(state.recent_tasks, max(limit, 0)))
+    return ORJSONResponse(
+        {
+            "tasks": tasks_list,
+            "total": len(state.recent_tasks),
+        }
+    )
 
 
 @router.delete("/tasks/queue")
@@ -51,88 +85,80 @@ async def clear_queue_items():
     return {"status": "cleared"}
 
 
-@router.get("/schedule/{date}")
-async def get_schedule_by_date(date: str) -> dict:
+@router.get("/schedule/{date}", response_class=ORJSONResponse)
+async def get_schedule_by_date(date: str) -> ORJSONResponse:
     """Get schedule for a specific date (YYYY-MM-DD)."""
-    schedule = state.recent_schedules.get(date, {})
-    return {
-        "date": date,
-        "schedule": schedule,
-    }
+    day = state.recent_schedules.get(date)
+    return ORJSONResponse(
+        {
+            "date": date,
+            "schedule": {"slots": [s.to_dict() for s in day["slots"]]} if day else {},
+        }
+    )
 
 
-@router.get("/schedule")
+@router.get("/schedule", response_class=ORJSONResponse)
 async def get_schedule(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     google_auth_store: Optional[GoogleAuthStore] = Depends(get_google_auth_store),
-) -> dict:
+) -> ORJSONResponse:
     """
     Get schedule for a date range.
     Defaults to today if no dates provided.
     Merges internally scheduled tasks with Google Calendar events if connected.
     """
     if not start_date:
-        start_date = datetime.now().strftime("%Y-%m-%d")
+        start_date = date.today().isoformat()
     if not end_date:
         end_date = start_date
 
     # Parse dates
     try:
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(
-            hour=0, minute=0, second=0
-        )
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(
-            hour=23, minute=59, second=59
-        )
+        first_day = date.fromisoformat(start_date)
+        last_day = date.fromisoformat(end_date)
     except ValueError:
         raise HTTPException(
             status_code=400, detail="Invalid date format. Use YYYY-MM-DD"
         )
+    # Canonical YYYY-MM-DD for the events cache key and the response
+    start_date, end_date = first_day.isoformat(), last_day.isoformat()
+    # Calendar bounds in UTC, as the range has always been queried
+    start_dt = datetime.combine(first_day, time.min, tzinfo=timezone.utc)
+    end_dt = datetime.combine(last_day, time(23, 59, 59), tzinfo=timezone.utc)
 
     all_slots = []
 
     # 1. Get local/LLM-generated schedule
-    # Iterate through days in range
-    current = start_dt
-    while current <= end_dt:
-        d_str = current.strftime("%Y-%m-%d")
-        stored_data = state.recent_schedules.get(d_str, {"slots": []})
-
-        # Add date context to slots if missing and flatten
-        day_slots = stored_data.get("slots", [])
-        for slot in day_slots:
-            # Check if start_time is just HH:MM
-            st = slot.get("start_time")
-            et = slot.get("end_time")
-
-            # Create full ISO string
-            if st and len(st) == 5:
-                slot["start_iso"] = f"{d_str}T{st}:00"
-            if et and len(et) == 5:
-                slot["end_iso"] = f"{d_str}T{et}:00"
-
-            slot["source"] = "planner"
-            # Ensure task has an ID for frontend drag-and-drop
-            if "task" in slot:
-                if "id" not in slot["task"]:
-                    slot["task"]["id"] = slot["task"].get(
-                        "title", f"local-{d_str}-{st}"
-                    )
-
-            all_slots.append(slot)
-
-        current = current + timedelta(days=1)
+    # Visit only stored days in range, in date order
+    for d_str in _stored_days(first_day, last_day):
+        # Full ISO strings come from the day plus the HH:MM times; the
+        # task id (title unless set) is what drag-and-drop moves send back
+        all_slots.extend(
+            slot.to_dict(d_str) for slot in state.recent_schedules[d_str]["slots"]
+        )
 
     # 2. Fetch from Google Calendar if connected
     if google_auth_store:
+        # (start_iso, title) of every slot so far, to skip events we already show
+        seen = {(s.get("start_iso"), s["task"]["title"]) for s in all_slots}
         try:
             creds = await google_auth_store.get_credentials(DEFAULT_USER_ID)
             if creds:
-                integration = CalendarIntegration(creds)
-
-                # Fetch range
-                events = await integration.get_events(start_dt, end_dt)
+                # Fetch range, reusing a recent fetch of the same range
+                cache_key = (DEFAULT_USER_ID, start_date, end_date)
+                cached = state.events_cache.get(cache_key)
+                if (
+                    cached is not None
+                    and monotonic() - cached[0] < settings.schedule_cache_ttl_s
+                ):
+                    events = cached[1]
+                else:
+                    integration = get_calendar_integration(creds, DEFAULT_USER_ID)
+                    events = await run_calendar_call(
+                        integration.get_events, start_dt, end_dt
+                    )
+                    state.events_cache[cache_key] = (monotonic(), events)
 
                 # Transform Google Events to Frontend Slots
                 for e in events:
@@ -161,21 +187,27 @@ async def get_schedule(
                     else:
                         end_iso = start_iso  # Fallback
 
-                    # Determine HH:MM for legacy support (optional)
-                    start_hhmm = (
-                        start_iso.split("T")[1][:5] if "T" in start_iso else "00:00"
-                    )
-                    end_hhmm = end_iso.split("T")[1][:5] if "T" in end_iso else "23:59"
-
-                    # Avoid duplicates with local scheduler
-                    # (Simple check could be improved)
-                    is_duplicate = any(
-                        s.get("start_iso") == start_iso
-                        and s["task"]["title"] == e.get("summary")
-                        for s in all_slots
-                    )
-
-                    if not is_duplicate:
+                    # The API can return events bleeding past the range
+                    # (e.g. all-day or recurring); skip those not touching it.
+                    # Compared as instants, so offsets near midnight count.
+                    try:
+                        if (
+                            _as_utc(start_iso) > end_dt
+                            or _as_utc(end_iso) < start_dt
+                        ):
+                            continue
+                    except ValueError:
+                        pass  # unparseable times: keep the event
+
+                    # Determine HH:MM for legacy support (optional); both are
+                    # YYYY-MM-DDTHH:MM... by now, so slice instead of splitting
+                    start_hhmm = start_iso[11:16] if len(start_iso) >= 16 else "00:00"
+                    end_hhmm = end_iso[11:16] if len(end_iso) >= 16 else "23:59"
+
+                    # Avoid duplicates with local scheduler and earlier events
+                    slot_key = (start_iso, e.get("summary"))
+                    if slot_key not in seen:
+                        seen.add(slot_key)
                         all_slots.append(
                             {
                                 "start_time": start_hhmm,
@@ -198,7 +230,9 @@ async def get_schedule(
             logger.error(f"Error merging Google Calendar events: {err}")
 
     # Return structure
-    return {"range": {"start": start_date, "end": end_date}, "slots": all_slots}
+    return ORJSONResponse(
+        {"range": {"start": start_date, "end": end_date}, "slots": all_slots}
+    )
 
 
 @router.post("/schedule/move")
@@ -213,11 +247,14 @@ async def move_task_schedule(
     """
     logger.info(f"Move request: {payload}")
 
+    # The old date of a Google event is unknown here; drop every cached range
+    state.invalidate_events_cache()
+
     # 1. Google Calendar Move
     if payload.source == "google" and google_auth_store:
         creds = await google_auth_store.get_credentials(DEFAULT_USER_ID)
         if creds:
-            integration = CalendarIntegration(creds)
+            integration = get_calendar_integration(creds, DEFAULT_USER_ID)
             # We need to construct a partial event update
             # Start/End in Google format
             # Basic implementation: just assume DateTime
@@ -226,8 +263,9 @@ async def move_task_schedule(
                 "end": {"dateTime": payload.new_end},
             }
             try:
-                # We need the update_event method in integration
-                updated = await integration.update_event(payload.task_id, event_patch)
+                updated = await run_calendar_call(
+                    integration.update_event, payload.task_id, event_patch
+                )
                 return {"status": "success", "updated": True}
             except Exception as e:
                 logger.error(f"Failed to move Google event: {e}")
@@ -249,41 +287,20 @@ async def move_task_schedule(
         target_id = payload.task_id
         logger.info(f"Looking for local task with ID/Title: {target_id}")
 
-        found = False
-        task_data = None
-
-        # Scan (inefficient but okay for small memory store)
-        for d_key, data in state.recent_schedules.items():
-            slots = data.get("slots", [])
-            for i, slot in enumerate(slots):
-                t_ctx = slot.get("task", {})
-                # Comparison: Check ID first, then Title
-                # Note: get_schedule now ensures 'id' exists equal to title for local tasks
-                if t_ctx.get("id") == target_id or t_ctx.get("title") == target_id:
-                    task_data = slot
-                    # Remove from old location
-                    del slots[i]
-                    found = True
-                    break
-            if found:
-                break
-
-        if found and task_data:
-            # Add to new date
-            if new_date_key not in state.recent_schedules:
-                state.recent_schedules[new_date_key] = {"slots": []}
+        # Matches on ID first, then Title
+        # Note: get_schedule ensures 'id' exists equal to title for local tasks
+        location = state.find_slot(target_id)
+        task_data = state.pop_slot(*location) if location else None
 
+        if task_data:
             # Update times
-            task_data["start_time"] = new_hhmm
-            task_data["end_time"] = new_end_hhmm
-            task_data["start_iso"] = payload.new_start
-            task_data["end_iso"] = payload.new_end
+            task_data.start_time = new_hhmm
+            task_data.end_time = new_end_hhmm
+            task_data.start_iso = payload.new_start
+            task_data.end_iso = payload.new_end
 
-            state.recent_schedules[new_date_key]["slots"].append(task_data)
-            # Re-sort?
-            state.recent_schedules[new_date_key]["slots"].sort(
-                key=lambda x: x["start_time"]
-            )
+            # Add to new date at its sorted position
+            state.insert_slot(new_date_key, task_data)
 
             return {"status": "success", "moved": True}
 
@@ -295,13 +312,14 @@ async def move_task_schedule(
     return {"status": "ignored"}
 
 
-@router.post("/tasks/create")
+@router.post("/tasks/create", status_code=202)
 async def create_manual_task(
     payload: CreateTaskIn,
     google_auth_store: Optional[GoogleAuthStore] = Depends(get_google_auth_store),
 ):
     """
     Manually create a scheduled task.
+    Google Calendar sync happens in the background (202 Accepted).
     """
     try:
         start_dt = datetime.fromisoformat(payload.start_time)
@@ -312,28 +330,49 @@ async def create_manual_task(
         # Determine duration
         duration_min = int((end_dt - start_dt).total_seconds() / 60)
 
-        new_task = {
-            "start_time": start_dt.strftime("%H:%M"),
-            "end_time": end_dt.strftime("%H:%M"),
-            "start_iso": payload.start_time,
-            "end_iso": payload.end_time,
-            "source": "planner",
-            "task": {
-                "id": payload.title,  # Simple ID
-                "title": payload.title,
-                "description": payload.description,
-                "category": payload.category,
-                "priority": payload.priority,
-                "estimated_duration": duration_min,
-                # "fixed_time": start_dt.strftime("%H:%M")
-            },
-        }
+        new_task = state.Slot(
+            start_time=start_dt.strftime("%H:%M"),
+            end_time=end_dt.strftime("%H:%M"),
+            title=payload.title,
+            category=payload.category,
+            priority=payload.priority,
+            estimated_duration=duration_min,
+            description=payload.description,
+            task_id=payload.title,  # Simple ID
+            start_iso=payload.start_time,
+            end_iso=payload.end_time,
+        )
 
-        if date_key not in state.recent_schedules:
-            state.recent_schedules[date_key] = {"slots": []}
+        # Hand off to the calendar sync worker, which batches bursts of creates.
+        # Queued before storing locally so a full backlog creates nothing.
+        creds = None
+        if google_auth_store:
+            creds = await google_auth_store.get_credentials(DEFAULT_USER_ID)
+        if creds:
+            try:
+                state.enqueue_calendar_sync(
+                    [
+                        ScheduledTask(
+                            title=payload.title,
+                            description=payload.description or "",
+                            category=payload.category,
+                            priority=payload.priority,
+                            estimated_duration_min=duration_min,
+                            start_time=start_dt,
+                            end_time=end_dt,
+                        )
+                    ]
+                )
+            except asyncio.QueueFull:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Calendar sync backlog is full, retry later",
+                )
+            except Exception as e:
+                logger.warning(f"Failed to queue manual task for calendar sync: {e}")
 
-        state.recent_schedules[date_key]["slots"].append(new_task)
-        state.recent_schedules[date_key]["slots"].sort(key=lambda x: x["start_time"])
+        state.insert_slot(date_key, new_task)
+        state.invalidate_events_cache(date_key)
 
         # Also add to recent tasks list
         state.recent_tasks.appendleft(
@@ -346,33 +385,10 @@ async def create_manual_task(
             }
         )
 
-        # Sync to Google Calendar if connected
-        if google_auth_store:
-            creds = await google_auth_store.get_credentials(DEFAULT_USER_ID)
-            if creds:
-                try:
-                    integration = CalendarIntegration(creds)
-                    # Convert raw dict to ScheduledTask model for the sync method
-                    task_obj = ScheduledTask(
-                        title=payload.title,
-                        description=payload.description or "",
-                        category=payload.category,
-                        priority=payload.priority,
-                        estimated_duration_min=duration_min,
-                        start_time=start_dt,
-                        end_time=end_dt,
-                    )
-                    synced_tasks = await asyncio.to_thread(integration.sync, [task_obj])
-                    logger.info(
-                        f"Manual task synced to Google Calendar: {len(synced_tasks)}"
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to sync manual task to Google Calendar: {e}"
-                    )
-
-        return {"status": "created", "task": new_task}
+        return {"status": "created", "task": new_task.to_dict()}
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid format: {e}")
     except Exception as e:
@@ -0,0 +1,74 @@
+import os
+from dataclasses import dataclass, field
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in {"1", "true", "yes"}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Backend configuration, read from the environment once at import."""
+
+    use_durable_queue: bool
+    energy_status_url: str
+    energy_status_ttl: float
+    energy_status_prefetch: bool
+    energy_price_threshold_eur: float
+    energy_fail_open: bool
+    queue_poll_interval_s: float
+    queue_batch_size: int
+    stale_recovery_interval_s: float
+    calendar_sync_flush_interval_s: float
+    calendar_sync_batch_size: int
+    calendar_sync_queue_max: int
+    calendar_sync_max_attempts: int
+    notes_process_workers: int
+    pending_count_ttl_s: float
+    calendar_threads: int
+    schedule_cache_ttl_s: float
+    enable_emissions_tracking: bool
+    prometheus_push_url: str
+    recent_tasks_max: int
+    recent_schedules_max_days: int
+    deployment_profile: str
+    google_client_id: str
+    google_client_secret: str = field(repr=False)
+    google_redirect_uri: str
+
+
+settings = Settings(
+    use_durable_queue=_env_bool("USE_DURABLE_QUEUE", "true"),
+    energy_status_url=os.getenv("ENERGY_STATUS_URL", "").strip(),
+    energy_status_ttl=float(os.getenv("ENERGY_STATUS_TTL", "30")),
+    # Refresh the energy status in the background so requests never wait on it
+    energy_status_prefetch=_env_bool("ENERGY_STATUS_PREFETCH", "true"),
+    energy_price_threshold_eur=float(os.getenv("ENERGY_PRICE_THRESHOLD_EUR", "0.70")),
+    energy_fail_open=_env_bool("ENERGY_FAIL_OPEN", "true"),
+    queue_poll_interval_s=float(os.getenv("QUEUE_POLL_INTERVAL_S", "5")),
+    queue_batch_size=int(os.getenv("QUEUE_BATCH_SIZE", "8")),
+    stale_recovery_interval_s=float(os.getenv("STALE_RECOVERY_INTERVAL_S", "60")),
+    calendar_sync_flush_interval_s=float(
+        os.getenv("CALENDAR_SYNC_FLUSH_INTERVAL_S", "0.5")
+    ),
+    calendar_sync_batch_size=int(os.getenv("CALENDAR_SYNC_BATCH_SIZE", "50")),
+    # Pending calendar writes beyond this are refused with 503
+    calendar_sync_queue_max=int(os.getenv("CALENDAR_SYNC_QUEUE_MAX", "1000")),
+    calendar_sync_max_attempts=int(os.getenv("CALENDAR_SYNC_MAX_ATTEMPTS", "3")),
+    # > 0 runs the notes pipeline in that many worker processes (default: threads)
+    notes_process_workers=int(os.getenv("NOTES_PROCESS_WORKERS", "0")),
+    pending_count_ttl_s=float(os.getenv("PENDING_COUNT_TTL_S", "5")),
+    calendar_threads=int(os.getenv("CALENDAR_THREADS", "4")),
+    schedule_cache_ttl_s=float(os.getenv("SCHEDULE_CACHE_TTL_S", "30")),
+    enable_emissions_tracking=_env_bool("ENABLE_EMISSIONS_TRACKING", "false"),
+    prometheus_push_url=os.getenv("PROMETHEUS_PUSH_URL", ""),
+    # Bounds for the in-memory display stores
+    recent_tasks_max=int(os.getenv("RECENT_TASKS_MAX", "100")),
+    recent_schedules_max_days=int(os.getenv("RECENT_SCHEDULES_MAX_DAYS", "365")),
+    deployment_profile=os.getenv("DEPLOYMENT_PROFILE", "unknown"),
+    google_client_id=os.getenv("GOOGLE_CLIENT_ID", ""),
+    google_client_secret=os.getenv("GOOGLE_CLIENT_SECRET", ""),
+    google_redirect_uri=os.getenv(
+        "GOOGLE_REDIRECT_URI", "http://localhost:8000/auth/google/callback"
+    ),
+)
@@ -1,29 +1,292 @@
-from collections import deque
+from collections import deque, OrderedDict
 import asyncio
-from typing import Optional, Deque, Dict, Any
-from codecarbon import EmissionsTracker
+import bisect
+import operator
+import httpx
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Deque, Dict, Any, Callable, List
 from storage.durable_queue import DurableQueue
 from storage.google_auth import GoogleAuthStore
-import os
+from planner_ai.models import ScheduledTask
+from api.settings import settings
+
+if TYPE_CHECKING:
+    from codecarbon import EmissionsTracker
+
+class BoundedDict(OrderedDict):
+    """Dict that drops its least recently written key once maxsize is exceeded."""
+
+    def __init__(
+        self, maxsize: int, on_evict: Optional[Callable[[Any, Any], None]] = None
+    ):
+        super().__init__()
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            old_key, old_value = self.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
 
 # In-memory storage for recent tasks (for display purposes)
-recent_tasks: Deque[Dict[str, Any]] = deque(maxlen=100)
+recent_tasks: Deque[Dict[str, Any]] = deque(maxlen=settings.recent_tasks_max)
+
+@dataclass(slots=True)
+class Slot:
+    """A scheduled task as stored in recent_schedules; to_dict() is the API shape."""
+
+    start_time: str  # HH:MM
+    end_time: str  # HH:MM
+    title: str
+    category: str = "work"
+    priority: int = 3
+    estimated_duration: int = 30
+    description: Optional[str] = None
+    task_id: Optional[str] = None
+    start_iso: Optional[str] = None
+    end_iso: Optional[str] = None
+    source: str = "planner"
+
+    def to_dict(self, date_key: Optional[str] = None) -> Dict[str, Any]:
+        """Frontend slot dict; with date_key, ISO times are derived from HH:MM."""
+        task = {
+            "id": self.task_id or self.title,
+            "title": self.title,
+            "category": self.category,
+            "priority": self.priority,
+            "estimated_duration": self.estimated_duration,
+        }
+        if self.description is not None:
+            task["description"] = self.description
+        out: Dict[str, Any] = {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "source": self.source,
+            "task": task,
+        }
+        start_iso, end_iso = self.start_iso, self.end_iso
+        if date_key and len(self.start_time) == 5:
+            start_iso = f"{date_key}T{self.start_time}:00"
+        if date_key and len(self.end_time) == 5:
+            end_iso = f"{date_key}T{self.end_time}:00"
+        if start_iso is not None:
+            out["start_iso"] = start_iso
+        if end_iso is not None:
+            out["end_iso"] = end_iso
+        return out
+
+
+_start_time = operator.attrgetter("start_time")
+
+# Task id (or title, for slots without one) -> date key of the day holding it
+task_index: Dict[str, str] = {}
+
+
+def _slot_key(slot: Slot) -> str:
+    return slot.task_id or slot.title
+
+
+def _index_slot(date_key: str, slot: Slot) -> None:
+    task_index[_slot_key(slot)] = date_key
+
+
+def _unindex_day(date_key: str, day: Dict[str, Any]) -> None:
+    for slot in day["slots"]:
+        key = _slot_key(slot)
+        if task_index.get(key) == date_key:
+            del task_index[key]
+
+
+# In-memory storage for recent schedules (keyed by date string).
+# Only days with at least one slot are kept, so a date missing here
+# means there is nothing local to show for it.
+# Each day holds its slots sorted by start_time plus a parallel
+# "start_times" column so inserts can binary-search plain strings.
+# Only touched from the event loop through the helpers below, none of
+# which await, so each write is atomic with respect to other coroutines
+# and needs no lock. Keep read-modify-write sequences (e.g. a move's
+# find_slot/pop_slot/insert_slot) free of awaits as well.
+recent_schedules: Dict[str, Dict[str, Any]] = BoundedDict(
+    settings.recent_schedules_max_days, on_evict=_unindex_day
+)
+
+
+def set_day_slots(date_key: str, slots: List[Slot]) -> None:
+    """Replace the schedule of a day, sorting its slots once."""
+    old_day = recent_schedules.get(date_key)
+    if old_day is not None:
+        _unindex_day(date_key, old_day)
+    slots = sorted(slots, key=_start_time)
+    recent_schedules[date_key] = {
+        "slots": slots,
+        "start_times": list(map(_start_time, slots)),
+    }
+    for slot in slots:
+        _index_slot(date_key, slot)
+
+
+def insert_slot(date_key: str, slot: Slot) -> None:
+    """Insert a slot into a day, keeping the day sorted by start_time."""
+    day = recent_schedules.get(date_key)
+    if day is None:
+        set_day_slots(date_key, [slot])
+        return
+    i = bisect.bisect_right(day["start_times"], slot.start_time)
+    day["start_times"].insert(i, slot.start_time)
+    day["slots"].insert(i, slot)
+    _index_slot(date_key, slot)
+
+
+def pop_slot(date_key: str, index: int) -> Slot:
+    """Remove and return the slot at index from a day, dropping the day once empty."""
+    day = recent_schedules[date_key]
+    del day["start_times"][index]
+    slot = day["slots"].pop(index)
+    if not day["slots"]:
+        del recent_schedules[date_key]
+    key = _slot_key(slot)
+    if task_index.get(key) == date_key:
+        del task_index[key]
+    return slot
+
+
+def find_slot(task_id: str) -> Optional[tuple]:
+    """Return (date_key, index) of the slot whose task id or title is task_id."""
+
+    def _match(slot: Slot) -> bool:
+        return slot.task_id == task_id or slot.title == task_id
+
+    # Only the indexed day is searched on a hit; fall back to a full scan
+    date_key = task_index.get(task_id)
+    day = recent_schedules.get(date_key) if date_key else None
+    if day is not None:
+        for i, slot in enumerate(day["slots"]):
+            if _match(slot):
+                return date_key, i
+    for d_key, data in recent_schedules.items():
+        for i, slot in enumerate(data["slots"]):
+            if _match(slot):
+                return d_key, i
+    return None
 
-# In-memory storage for recent schedules (keyed by date string)
-recent_schedules: Dict[str, Dict[str, Any]] = {}
 
 # Legacy in-memory queue (used when USE_DURABLE_QUEUE=false)
 notes_queue: asyncio.Queue[str] = asyncio.Queue()
 
+# Signalled whenever notes are queued, so idle queue workers wake at once
+# instead of waiting out their poll interval
+queue_cv = asyncio.Condition()
+
+
+async def notify_queue() -> None:
+    """Wake queue workers waiting in wait_for_queue()."""
+    async with queue_cv:
+        queue_cv.notify_all()
+
+
+async def wait_for_queue(timeout: float) -> None:
+    """Wait for notify_queue(), giving up after timeout seconds."""
+    async with queue_cv:
+        try:
+            await asyncio.wait_for(queue_cv.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# Tasks waiting to be pushed to Google Calendar by the calendar sync worker
+calendar_sync_queue: asyncio.Queue[ScheduledTask] = asyncio.Queue(
+    maxsize=settings.calendar_sync_queue_max
+)
+
+# Tasks the calendar sync worker gave up on (not connected, or out of retries)
+calendar_sync_dead_letter: Deque[ScheduledTask] = deque(
+    maxlen=settings.calendar_sync_queue_max
+)
+
+
+def enqueue_calendar_sync(tasks: List[ScheduledTask]) -> None:
+    """Queue tasks for the calendar sync worker, all or none.
+
+    Raises asyncio.QueueFull if they do not all fit.
+    """
+    queue = calendar_sync_queue
+    if queue.maxsize and queue.qsize() + len(tasks) > queue.maxsize:
+        raise asyncio.QueueFull
+    for task in tasks:
+        queue.put_nowait(task)
+
+
+def enqueue_calendar_sync_or_dead_letter(tasks: List[ScheduledTask]) -> int:
+    """Queue as many tasks as fit; the rest go to calendar_sync_dead_letter.
+
+    Returns the number of tasks dead-lettered.
+    """
+    for n, task in enumerate(tasks):
+        try:
+            calendar_sync_queue.put_nowait(task)
+        except asyncio.QueueFull:
+            calendar_sync_dead_letter.extend(tasks[n:])
+            return len(tasks) - n
+    return 0
+
 # Global instances initialized at startup
 durable_queue: Optional[DurableQueue] = None
 google_auth_store: Optional[GoogleAuthStore] = None
 
-# CodeCarbon tracker configuration
-PROMETHEUS_PUSH_URL = os.getenv("PROMETHEUS_PUSH_URL", "")
-tracker = EmissionsTracker(
-    project_name="planner-ai-backend",
-    save_to_prometheus=bool(PROMETHEUS_PUSH_URL),
-    prometheus_url=PROMETHEUS_PUSH_URL or "http://localhost:9091",
-    log_level="error",
+# Worker processes for the notes pipeline (NOTES_PROCESS_WORKERS > 0)
+process_pool: Optional[ProcessPoolExecutor] = None
+
+# Shared outbound HTTP client, opened on startup
+http_client: Optional[httpx.AsyncClient] = None
+
+# Blocking Google Calendar calls run here, not in the default executor, so
+# a burst of syncs cannot starve notes processing or energy fetches
+calendar_executor = ThreadPoolExecutor(
+    max_workers=settings.calendar_threads, thread_name_prefix="gcal"
 )
+
+# Google Calendar events fetched by /schedule, keyed by
+# (user_id, start_date, end_date) -> (time.monotonic() of fetch, events)
+events_cache: Dict[tuple, tuple] = BoundedDict(64)
+
+
+def invalidate_events_cache(date_key: Optional[str] = None) -> None:
+    """Drop cached event ranges containing date_key (all ranges if None)."""
+    if date_key is None:
+        events_cache.clear()
+        return
+    for key in [k for k in events_cache if k[1] <= date_key <= k[2]]:
+        del events_cache[key]
+
+
+# Google Calendar clients per user id, as (credentials key, integration);
+# see dependencies.get_calendar_integration
+calendar_integrations: Dict[str, tuple] = {}
+
+# CodeCarbon tracker configuration. Building a tracker probes the hardware,
+# so it only happens in get_tracker(), and only with ENABLE_EMISSIONS_TRACKING.
+tracker: Optional["EmissionsTracker"] = None
+
+# Resolved with the tracker; not every codecarbon version has flush()
+tracker_flush: Optional[Callable[[], Any]] = None
+
+
+def get_tracker() -> Optional["EmissionsTracker"]:
+    """Return the CodeCarbon tracker, creating it on first use if enabled."""
+    global tracker, tracker_flush
+    if tracker is None and settings.enable_emissions_tracking:
+        from codecarbon import EmissionsTracker
+
+        tracker = EmissionsTracker(
+            project_name="planner-ai-backend",
+            save_to_prometheus=bool(settings.prometheus_push_url),
+            prometheus_url=settings.prometheus_push_url or "http://localhost:9091",
+            log_level="error",
+        )
+        tracker_flush = getattr(tracker, "flush", None)
+    return tracker
@@ -1,41 +1,140 @@
 import asyncio
 import logging
 import time
-import os
 from typing import Optional
 from datetime import datetime
 
 from api import state
-from api.routers.notes import _process_notes, _serialize_status, _get_energy_status
-from integration.calendar_integration import CalendarIntegration
+from api.settings import settings
+from api.dependencies import (
+    get_calendar_integration,
+    get_energy_status,
+    policy,
+    refresh_energy_status,
+    run_calendar_call,
+)
+from api.routers.notes import _fmt_hhmm, _process_notes
+from energy.price_signal import EnergyStatus
 from planner_ai.models import ScheduledTask
+from storage.durable_queue import DequeueResult
 
-# Re-use policy from state or create a local reference if preferred,
-# but best to use the one in dependencies or state.
 # Since workers run in background, dependency injection isn't as straightforward.
-# We'll use the global instances in state.py (which are populated on startup).
-from api.state import (
-    durable_queue,
-    google_auth_store,
-    notes_queue,
-    recent_tasks,
-    recent_schedules,
-)
-from energy.policy import EnergyPolicy
+# They read the global instances through the state module (populated on startup);
+# importing the names directly would bind the pre-startup None values.
+from api.state import Slot
 
 logger = logging.getLogger(__name__)
 
-# Config
-ENERGY_PRICE_THRESHOLD_EUR = float(os.getenv("ENERGY_PRICE_THRESHOLD_EUR", "0.70"))
-ENERGY_FAIL_OPEN = os.getenv("ENERGY_FAIL_OPEN", "true").lower() in {"1", "true", "yes"}
-QUEUE_POLL_INTERVAL_S = float(os.getenv("QUEUE_POLL_INTERVAL_S", "5"))
-STALE_RECOVERY_INTERVAL_S = float(os.getenv("STALE_RECOVERY_INTERVAL_S", "60"))
 DEFAULT_USER_ID = "default"
 
-policy = EnergyPolicy(
-    price_threshold_eur=ENERGY_PRICE_THRESHOLD_EUR,
-    fail_open=ENERGY_FAIL_OPEN,
-)
+
+def _schedule_to_slots(schedule: list[dict]) -> list[Slot]:
+    """Convert a processed schedule list to stored slots."""
+    return [
+        Slot(
+            start_time=_fmt_hhmm(s.get("start_time", "")),
+            end_time=_fmt_hhmm(s.get("end_time", "")),
+            title=s.get("title", "Task"),
+            category=s.get("category", "work"),
+            priority=s.get("priority", 3),
+            estimated_duration=s.get("estimated_duration_min", 30),
+        )
+        for s in schedule
+    ]
+
+
+async def _process_one(
+    item: DequeueResult, llm_tier: str, status: Optional[EnergyStatus]
+) -> None:
+    """Process one dequeued durable-queue item and record its outcome."""
+    logger.info(
+        f"Processing queued item {item.id} (attempt {item.attempts}, tier: {llm_tier})"
+    )
+
+    try:
+        result = await _process_notes(item.notes, llm_tier=llm_tier)
+
+        # Store tasks and schedule
+        now = datetime.now()
+        if "tasks" in result and result["tasks"]:
+            created_at = now.isoformat()
+            for task in result["tasks"]:
+                task["created_at"] = created_at
+                task["queue_item_id"] = item.id
+            state.recent_tasks.extendleft(result["tasks"])
+        if "schedule" in result and result["schedule"]:
+            date_str = now.strftime("%Y-%m-%d")
+            slots = _schedule_to_slots(result["schedule"])
+            state.set_day_slots(date_str, slots)
+            logger.info(f"Stored schedule with {len(slots)} slots for {date_str}")
+
+        # Sync to Google Calendar if possible
+        if "schedule" in result and result["schedule"] and state.google_auth_store:
+            try:
+                credentials = await state.google_auth_store.get_credentials(
+                    DEFAULT_USER_ID
+                )
+                if credentials:
+                    # Convert JSON result back to ScheduledTask objects
+                    task_objects = []
+                    # result["schedule"] is a list of task dicts
+                    for task_item in result["schedule"]:
+                        try:
+                            s_time = task_item.get("start_time")
+                            e_time = task_item.get("end_time")
+
+                            # Handle string to datetime conversion
+                            if isinstance(s_time, str):
+                                s_time = datetime.fromisoformat(s_time)
+                            if isinstance(e_time, str):
+                                e_time = datetime.fromisoformat(e_time)
+
+                            t = ScheduledTask(
+                                title=task_item.get("title", "Untitled"),
+                                description=task_item.get("description"),
+                                category=task_item.get("category"),
+                                priority=task_item.get("priority", 3),
+                                estimated_duration_min=task_item.get(
+                                    "estimated_duration_min", 30
+                                ),
+                                start_time=s_time,
+                                end_time=e_time,
+                            )
+                            task_objects.append(t)
+                        except Exception as e:
+                            logger.warning(
+                                f"Skipping task for sync due to parse error: {e}"
+                            )
+
+                    # The calendar sync worker batches these with other
+                    # pending writes into as few Google round trips as it can
+                    dead = state.enqueue_calendar_sync_or_dead_letter(task_objects)
+                    if dead:
+                        logger.error(
+                            f"Calendar sync backlog full: dead-lettered {dead} tasks"
+                        )
+                    logger.info(
+                        f"Queued {len(task_objects) - dead} tasks for Google Calendar sync"
+                    )
+
+            except Exception as e:
+                logger.error(f"Failed to queue schedule for calendar sync: {e}")
+
+        # Mark as completed
+        await state.durable_queue.complete(
+            item_id=item.id,
+            result=result,
+            energy_price_eur=status.electricity_price_eur if status else None,
+            solar_available=status.solar_available if status else None,
+            llm_tier=llm_tier,
+        )
+        logger.info(f"Successfully processed queued item {item.id}")
+
+    except Exception as e:
+        logger.exception(f"Failed to process queued item {item.id}: {e}")
+        new_status = await state.durable_queue.fail(item.id, str(e))
+        if new_status == "dead":
+            logger.error(f"Item {item.id} moved to dead letter queue after max retries")
 
 
 async def _durable_queue_worker() -> None:
@@ -47,159 +146,51 @@ async def _durable_queue_worker() -> None:
             # Check if there are pending items
             # Access global state via the imported module variables
             if state.durable_queue is None:
-                await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
+                await asyncio.sleep(settings.queue_poll_interval_s)
                 continue
 
             pending_count = await state.durable_queue.get_pending_count()
             if pending_count == 0:
-                await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
+                await state.wait_for_queue(settings.queue_poll_interval_s)
                 continue
 
             # Check energy status
-            status = await _get_energy_status()
+            status = await get_energy_status()
             if not policy.should_process_now(status):
                 logger.debug(
                     f"Energy conditions not favorable, waiting... ({pending_count} items pending)"
                 )
-                await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
-                continue
-
-            # Dequeue and process
-            item = await state.durable_queue.dequeue()
-            if item is None:
-                await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
+                await asyncio.sleep(settings.queue_poll_interval_s)
                 continue
 
+            # Drain up to a batch of items under this energy decision
             llm_tier = policy.llm_tier(status)
-            logger.info(
-                f"Processing queued item {item.id} (attempt {item.attempts}, tier: {llm_tier})"
-            )
+            processed = 0
+            while processed < settings.queue_batch_size:
+                item = await state.durable_queue.dequeue()
+                if item is None:
+                    break
+                await _process_one(item, llm_tier, status)
+                processed += 1
 
-            try:
-                result = await _process_notes(item.notes, llm_tier=llm_tier)
-
-                # Store tasks and schedule
-                if "tasks" in result and result["tasks"]:
-                    for task in result["tasks"]:
-                        task["created_at"] = datetime.now().isoformat()
-                        task["queue_item_id"] = item.id
-                        state.recent_tasks.appendleft(task)
-                if "schedule" in result and result["schedule"]:
-                    date_str = datetime.now().strftime("%Y-%m-%d")
-                    # Convert schedule list to format expected by frontend
-                    schedule_list = result["schedule"]
-                    slots = []
-                    for s in schedule_list:
-                        # Extract start/end times as HH:MM strings
-                        start_time = s.get("start_time", "")
-                        end_time = s.get("end_time", "")
-                        # Handle datetime objects or ISO strings
-                        if hasattr(start_time, "strftime"):
-                            start_time = start_time.strftime("%H:%M")
-                        elif isinstance(start_time, str) and "T" in start_time:
-                            start_time = start_time.split("T")[1][:5]
-                        if hasattr(end_time, "strftime"):
-                            end_time = end_time.strftime("%H:%M")
-                        elif isinstance(end_time, str) and "T" in end_time:
-                            end_time = end_time.split("T")[1][:5]
-                        slots.append(
-                            {
-                                "start_time": start_time,
-                                "end_time": end_time,
-                                "task": {
-                                    "title": s.get("title", "Task"),
-                                    "category": s.get("category", "work"),
-                                    "priority": s.get("priority", 3),
-                                    "estimated_duration": s.get(
-                                        "estimated_duration_min", 30
-                                    ),
-                                },
-                            }
-                        )
-                    state.recent_schedules[date_str] = {"slots": slots}
-                    logger.info(
-                        f"Stored schedule with {len(slots)} slots for {date_str}"
-                    )
-
-                # Sync to Google Calendar if possible
-                if (
-                    "schedule" in result
-                    and result["schedule"]
-                    and state.google_auth_store
-                ):
-                    try:
-                        credentials = await state.google_auth_store.get_credentials(
-                            DEFAULT_USER_ID
-                        )
-                        if credentials:
-                            logger.info("Syncing schedule to Google Calendar...")
-
-                            # Convert JSON result back to ScheduledTask objects
-                            task_objects = []
-                            # result["schedule"] is a list of task dicts
-                            for task_item in result["schedule"]:
-                                try:
-                                    s_time = task_item.get("start_time")
-                                    e_time = task_item.get("end_time")
-
-                                    # Handle string to datetime conversion
-                                    if isinstance(s_time, str):
-                                        s_time = datetime.fromisoformat(s_time)
-                                    if isinstance(e_time, str):
-                                        e_time = datetime.fromisoformat(e_time)
-
-                                    t = ScheduledTask(
-                                        title=task_item.get("title", "Untitled"),
-                                        description=task_item.get("description"),
-                                        category=task_item.get("category"),
-                                        priority=task_item.get("priority", 3),
-                                        estimated_duration_min=task_item.get(
-                                            "estimated_duration_min", 30
-                                        ),
-                                        start_time=s_time,
-                                        end_time=e_time,
-                                    )
-                                    task_objects.append(t)
-                                except Exception as e:
-                                    logger.warning(
-                                        f"Skipping task for sync due to parse error: {e}"
-                                    )
-
-                            cal_integration = CalendarIntegration(
-                                credentials=credentials
-                            )
-                            # Run sync in thread as it uses blocking Http requests
-                            synced_tasks = await asyncio.to_thread(
-                                cal_integration.sync, task_objects
-                            )
-                            logger.info(
-                                f"Synced {len(synced_tasks)} tasks to Google Calendar"
-                            )
+            if processed == 0:
+                await state.wait_for_queue(settings.queue_poll_interval_s)
 
-                    except Exception as e:
-                        logger.error(f"Failed to auto-sync to calendar: {e}")
+        except Exception as e:
+            logger.exception(f"Error in durable queue worker: {e}")
+            await asyncio.sleep(settings.queue_poll_interval_s)
 
-                # Mark as completed
-                await state.durable_queue.complete(
-                    item_id=item.id,
-                    result=result,
-                    energy_price_eur=status.electricity_price_eur if status else None,
-                    solar_available=status.solar_available if status else None,
-                    llm_tier=llm_tier,
-                )
-                logger.info(f"Successfully processed queued item {item.id}")
 
-            except Exception as e:
-                logger.exception(f"Failed to process queued item {item.id}: {e}")
-                new_status = await state.durable_queue.fail(item.id, str(e))
-                if new_status == "dead":
-                    logger.error(
-                        f"Item {item.id} moved to dead letter queue after max retries"
-                    )
+async def _energy_refresh_worker() -> None:
+    """Re-fetch the energy status every half TTL so readers always hit the cache."""
+    logger.info("Energy status refresh worker started")
 
+    while True:
+        try:
+            await refresh_energy_status()
         except Exception as e:
-            logger.exception(f"Error in durable queue worker: {e}")
-            await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
+            logger.warning(f"Energy status refresh failed: {e}")
+        await asyncio.sleep(max(settings.energy_status_ttl / 2, 1.0))
 
 
 async def _stale_recovery_worker() -> None:
@@ -207,7 +198,7 @@ async def _stale_recovery_worker() -> None:
     logger.info("Stale recovery worker started")
 
     while True:
-        await asyncio.sleep(STALE_RECOVERY_INTERVAL_S)
+        await asyncio.sleep(settings.stale_recovery_interval_s)
 
         if state.durable_queue is None:
             continue
@@ -220,18 +211,83 @@ async def _stale_recovery_worker() -> None:
             logger.error(f"Error in stale recovery worker: {e}")
 
 
+async def _calendar_sync_worker() -> None:
+    """Push queued tasks (manual creates, /notes schedules) to Google Calendar in batches."""
+    logger.info("Calendar sync worker started")
+
+    while True:
+        batch = [await state.calendar_sync_queue.get()]
+
+        # Give concurrent submissions a moment to pile up, then drain them together
+        await asyncio.sleep(settings.calendar_sync_flush_interval_s)
+        while (
+            len(batch) < settings.calendar_sync_batch_size
+            and not state.calendar_sync_queue.empty()
+        ):
+            batch.append(state.calendar_sync_queue.get_nowait())
+
+        try:
+            await _sync_calendar_batch(batch)
+        finally:
+            for _ in batch:
+                state.calendar_sync_queue.task_done()
+
+
+async def _sync_calendar_batch(batch: list[ScheduledTask]) -> None:
+    """Push one batch to Google Calendar, retrying failed writes with backoff.
+
+    Tasks that cannot be written (calendar not connected, or still failing
+    after CALENDAR_SYNC_MAX_ATTEMPTS) go to state.calendar_sync_dead_letter.
+    """
+    for attempt in range(1, settings.calendar_sync_max_attempts + 1):
+        try:
+            credentials = None
+            if state.google_auth_store:
+                credentials = await state.google_auth_store.get_credentials(
+                    DEFAULT_USER_ID
+                )
+            if not credentials:
+                logger.error(
+                    f"Dead-lettering {len(batch)} queued tasks: Google Calendar not connected"
+                )
+                state.calendar_sync_dead_letter.extend(batch)
+                return
+
+            cal_integration = get_calendar_integration(credentials, DEFAULT_USER_ID)
+            result = await run_calendar_call(cal_integration.try_sync, batch)
+            state.invalidate_events_cache()
+            logger.info(
+                f"Synced {len(batch) - len(result.retry)} queued tasks to Google Calendar"
+            )
+            if not result.retry:
+                return
+            batch = result.retry
+        except Exception as e:
+            logger.warning(f"Failed to sync queued tasks to Google Calendar: {e}")
+
+        logger.warning(
+            f"{len(batch)} calendar writes failed "
+            f"(attempt {attempt}/{settings.calendar_sync_max_attempts})"
+        )
+        if attempt < settings.calendar_sync_max_attempts:
+            await asyncio.sleep(settings.calendar_sync_flush_interval_s * 2**attempt)
+
+    logger.error(f"Dead-lettering {len(batch)} queued tasks after repeated sync failures")
+    state.calendar_sync_dead_letter.extend(batch)
+
+
 async def _queue_worker() -> None:
     """Legacy in-memory queue worker (used when USE_DURABLE_QUEUE=false)."""
     logger.info("In-memory queue worker started")
 
     while True:
         if state.notes_queue.empty():
-            await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
+            await state.wait_for_queue(settings.queue_poll_interval_s)
             continue
 
-        status = await _get_energy_status()
+        status = await get_energy_status()
         if not policy.should_process_now(status):
-            await asyncio.sleep(QUEUE_POLL_INTERVAL_S)
+            await asyncio.sleep(settings.queue_poll_interval_s)
             continue
 
         notes = await state.notes_queue.get()
@@ -239,42 +295,15 @@ async def _queue_worker() -> None:
             result = await _process_notes(notes, llm_tier=policy.llm_tier(status))
 
             # Store tasks and schedule
+            now = datetime.now()
             if "tasks" in result and result["tasks"]:
+                created_at = now.isoformat()
                 for task in result["tasks"]:
-                    task["created_at"] = datetime.now().isoformat()
-                    state.recent_tasks.appendleft(task)
+                    task["created_at"] = created_at
+                state.recent_tasks.extendleft(result["tasks"])
             if "schedule" in result and result["schedule"]:
-                date_str = datetime.now().strftime("%Y-%m-%d")
-                # Convert schedule list to format expected by frontend
-                schedule_list = result["schedule"]
-                slots = []
-                for s in schedule_list:
-                    start_time = s.get("start_time", "")
-                    end_time = s.get("end_time", "")
-                    # Handle datetime objects or ISO strings
-                    if hasattr(start_time, "strftime"):
-                        start_time = start_time.strftime("%H:%M")
-                    elif isinstance(start_time, str) and "T" in start_time:
-                        start_time = start_time.split("T")[1][:5]
-                    if hasattr(end_time, "strftime"):
-                        end_time = end_time.strftime("%H:%M")
-                    elif isinstance(end_time, str) and "T" in end_time:
-                        end_time = end_time.split("T")[1][:5]
-                    slots.append(
-                        {
-                            "start_time": start_time,
-                            "end_time": end_time,
-                            "task": {
-                                "title": s.get("title", "Task"),
-                                "category": s.get("category", "work"),
-                                "priority": s.get("priority", 3),
-                                "estimated_duration": s.get(
-                                    "estimated_duration_min", 30
-                                ),
-                            },
-                        }
-                    )
-                state.recent_schedules[date_str] = {"slots": slots}
+                date_str = now.strftime("%Y-%m-%d")
+                state.set_day_slots(date_str, _schedule_to_slots(result["schedule"]))
 
         except Exception:
             logger.exception("Failed to process queued notes")
@@ -1,14 +1,39 @@
 from __future__ import annotations
 
 import logging
+import os
+import sys
 from typing import Optional, Any
 
 from planner_ai.models import Task
-from llm.llm_client import LLMClient
-from storage.preferences_store import PreferencesStore
+from llm.concurrency import map_bounded
+from llm.llm_client import LLMClient, default_client
+from storage.preferences_store import PreferencesStore, default_preferences_store
 
 logger = logging.getLogger(__name__)
 
+# Longer task lists are classified in chunks of this size, concurrently
+CLASSIFY_CHUNK_SIZE = int(os.getenv("CLASSIFY_CHUNK_SIZE", "20"))
+
+# Categories the prompts ask for, mapped to one shared string object each
+_CATEGORIES = {c: c for c in ("work", "personal", "health", "learning", "other", "general")}
+
+
+def _normalize_category(category: Optional[str]) -> str:
+    """Lowercased, stripped category, interned so equal categories share one string."""
+    category = (category or "other").strip().lower()
+    return _CATEGORIES.get(category) or sys.intern(category)
+
+
+def _clamp_priority(priority: Any) -> int:
+    """Priority as an int in 1..5; 3 when it is not a number."""
+    if type(priority) is not int:
+        try:
+            priority = int(priority)
+        except (TypeError, ValueError):
+            return 3
+    return max(1, min(5, priority))
+
 
 class TaskClassifier:
     """
@@ -24,8 +49,8 @@ class TaskClassifier:
         llm_client: Optional[LLMClient] = None,
         preferences_store: Optional[PreferencesStore] = None,
     ):
-        self.llm_client = llm_client or LLMClient()
-        self.preferences_store = preferences_store or PreferencesStore()
+        self.llm_client = llm_client or default_client()
+        self.preferences_store = preferences_store or default_preferences_store()
 
     def classify(self, tasks: list[Task], llm_tier: str = "large") -> list[Task]:
         """
@@ -38,32 +63,38 @@ class TaskClassifier:
         if not tasks:
             return []
 
-        normalized: list[Task] = [t if isinstance(t, Task) else Task(**t) for t in tasks]
-
-        # Preferences can be used later for better prompts/rules; keep it loaded and available.
-        _prefs = self.preferences_store.load()
-
         # ECO mode: avoid expensive classification. Use safe defaults.
         # This makes tier have a real effect even if LLMClient doesn't expose "tier" directly.
         if tier == "eco":
             out: list[Task] = []
-            for t in normalized:
-                category = (t.category or "other").strip().lower()
-                priority = t.priority if t.priority is not None else 3
-                out.append(t.model_copy(update={"category": category, "priority": int(priority)}))
+            for t in tasks:
+                if not isinstance(t, Task):
+                    t = Task(**t)
+                out.append(self._with_labels(t, _normalize_category(t.category), _clamp_priority(t.priority)))
             return out
 
         # FAST/LARGE: run LLM classification
-        payload = [t.model_dump() for t in normalized]
-        classified = self.llm_client.classify_tasks(payload)
+        # Normalize and build the payload in one pass. Tasks are validated, so
+        # shallow field dicts serialize the same as model_dump()
+        normalized: list[Task] = []
+        payload: list[dict[str, Any]] = []
+        for t in tasks:
+            if not isinstance(t, Task):
+                t = Task(**t)
+            normalized.append(t)
+            payload.append(dict(t.__dict__))
+        classified = self._classify_payload(payload)
 
         if not classified:
             logger.warning("TaskClassifier: empty classification result, returning original tasks")
             return normalized
 
+        # Title -> first task with that title, for O(1) merge lookups
+        index = {t.title: t for t in reversed(normalized)}
+
         out: list[Task] = []
         for item in classified:
-            task = self._merge_task(normalized, item)
+            task = self._merge_task(index, item)
             if task is not None:
                 out.append(task)
 
@@ -76,7 +107,34 @@ class TaskClassifier:
 
         return out
 
-    def _merge_task(self, original: list[Task], item: Any) -> Optional[Task]:
+    def _classify_payload(self, payload: list[dict[str, Any]]) -> list[Any]:
+        """
+        LLM classification of the payload. Long lists are split into chunks
+        sent concurrently, which keeps each prompt short; results keep input order.
+        """
+        if CLASSIFY_CHUNK_SIZE <= 0 or len(payload) <= CLASSIFY_CHUNK_SIZE:
+            return self.llm_client.classify_tasks(payload)
+
+        chunks = [
+            payload[i : i + CLASSIFY_CHUNK_SIZE]
+            for i in range(0, len(payload), CLASSIFY_CHUNK_SIZE)
+        ]
+        # A chunk that keeps failing contributes nothing; its tasks are kept unchanged
+        results = map_bounded(self.llm_client.classify_tasks, chunks, fallback=lambda chunk: [])
+        return [item for result in results if result for item in result]
+
+    def classify_many(self, task_lists: list[list[Task]], llm_tier: str = "large") -> list[list[Task]]:
+        """
+        Classify several independent task lists concurrently (one LLM call each).
+        A list whose call keeps failing is returned unclassified.
+        """
+        return map_bounded(
+            lambda tasks: self.classify(tasks, llm_tier=llm_tier),
+            task_lists,
+            fallback=lambda tasks: [t if isinstance(t, Task) else Task(**t) for t in tasks],
+        )
+
+    def _merge_task(self, index: dict[str, Task], item: Any) -> Optional[Task]:
         """
         Merge LLM classification result back into Task.
         Title is used as a stable key in this minimal implementation.
@@ -94,23 +152,20 @@ class TaskClassifier:
                 return None
 
             # Find the original task by title
-            base = next((t for t in original if t.title == title), None)
+            base = index.get(title)
             if base is None:
                 base = Task(title=title)
 
-            category = (item.get("category") or base.category or "other").strip().lower()
-            priority = item.get("priority", base.priority if base.priority is not None else 3)
+            category = _normalize_category(item.get("category") or base.category)
+            priority = _clamp_priority(item.get("priority", base.priority))
 
-            try:
-                priority = int(priority)
-            except (TypeError, ValueError):
-                priority = 3
-            if priority < 1:
-                priority = 1
-            if priority > 5:
-                priority = 5
-
-            merged = base.model_copy(update={"category": category, "priority": priority})
-            return merged
+            return self._with_labels(base, category, priority)
         except Exception:
             return None
+
+    @staticmethod
+    def _with_labels(task: Task, category: str, priority: int) -> Task:
+        """task with the given category/priority; task itself if they already match."""
+        if task.category == category and task.priority == priority:
+            return task
+        return task.model_copy(update={"category": category, "priority": priority})
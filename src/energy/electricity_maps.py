@@ -1,20 +1,72 @@
+import atexit
+import importlib.util
 import logging
+import threading
 import time
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import NamedTuple, Optional
 import os
-import requests
+import httpx
 
 logger = logging.getLogger(__name__)
 
+# Kept-alive connections to the API, retrying failed connects. With h2
+# installed (httpx[http2]) requests go over one multiplexed HTTP/2 connection.
+_client = httpx.Client(
+    timeout=5.0,
+    transport=httpx.HTTPTransport(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+        retries=2,
+    ),
+)
+atexit.register(_client.close)
 
-@dataclass
+
+def _env_float(name: str, default: float) -> float:
+    """Float env var; a malformed value falls back to default with a warning."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"Invalid {name}={raw!r}, using {default}")
+        return default
+
+
+# Successful results per (base_url, zone), reused for ELECTRICITY_MAPS_TTL_S
+_CACHE_TTL_S = _env_float("ELECTRICITY_MAPS_TTL_S", 60.0)
+_cache: dict[tuple[str, str], tuple[float, dict]] = {}
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
 class ElectricityMapsConfig:
     api_key: str
     zone: str = "DE"  # Default to Germany
     base_url: str = "https://api.electricitymap.org/v3"
 
 
+class _Endpoints(NamedTuple):
+    breakdown_url: str
+    carbon_url: str
+    headers: dict
+    params: dict
+
+
+@lru_cache(maxsize=4)
+def _endpoints(config: ElectricityMapsConfig) -> _Endpoints:
+    """URLs and request arguments for a config, built once per distinct config."""
+    return _Endpoints(
+        breakdown_url=f"{config.base_url}/power-breakdown/latest",
+        carbon_url=f"{config.base_url}/carbon-intensity/latest",
+        headers={"auth-token": config.api_key},
+        params={"zone": config.zone},
+    )
+
+
 def fetch_from_electricity_maps(config: ElectricityMapsConfig) -> Optional[dict]:
     """
     Fetch live carbon intensity and power breakdown from Electricity Maps.
@@ -23,42 +75,70 @@ def fetch_from_electricity_maps(config: ElectricityMapsConfig) -> Optional[dict]
     - carbon_intensity (gCO2eq/kWh)
     - renewable_percentage (%)
     - price (if available, else None)
+
+    Successful results are reused for ELECTRICITY_MAPS_TTL_S seconds.
     """
     if not config.api_key:
         logger.warning("Electricity Maps API key not configured")
         return None
 
+    key = (config.base_url, config.zone)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _CACHE_TTL_S:
+        return dict(cached[1])
+
+    result = _fetch(config)
+    if result is not None:
+        with _cache_lock:
+            _cache[key] = (time.monotonic(), result)
+        result = dict(result)
+    return result
+
+
+def _fetch_carbon_intensity(url: str, headers: dict, params: dict) -> Optional[float]:
+    """Carbon intensity from the dedicated endpoint; None if unavailable."""
     try:
-        # Fetch power breakdown to get renewable percentage
-        url = f"{config.base_url}/power-breakdown/latest"
-        headers = {"auth-token": config.api_key}
-        params = {"zone": config.zone}
+        resp_carbon = _client.get(url, headers=headers, params=params, timeout=5.0)
+        if resp_carbon.is_success:
+            carbon_intensity = resp_carbon.json().get("carbonIntensity")
+            logger.info(f"Fetched carbon intensity from dedicated endpoint: {carbon_intensity}")
+            return carbon_intensity
+    except Exception as e_carbon:
+        logger.warning(f"Failed to fetch fallback carbon intensity: {e_carbon}")
+    return None
 
-        response = requests.get(url, headers=headers, params=params, timeout=5.0)
+
+def _fetch(config: ElectricityMapsConfig) -> Optional[dict]:
+    endpoints = _endpoints(config)
+
+    try:
+        # Fetch power breakdown to get renewable percentage
+        response = _client.get(
+            endpoints.breakdown_url,
+            headers=endpoints.headers,
+            params=endpoints.params,
+            timeout=5.0,
+        )
         response.raise_for_status()
         data = response.json()
 
         carbon_intensity = data.get("carbonIntensity")
-        
-        # If carbon intensity is missing from breakdown, try specific endpoint
+
+        # If carbon intensity is missing from breakdown, try specific endpoint.
+        # Only then: the API is rate limited and metered per request.
         if carbon_intensity is None:
-            try:
-                url_carbon = f"{config.base_url}/carbon-intensity/latest"
-                resp_carbon = requests.get(url_carbon, headers=headers, params=params, timeout=5.0)
-                if resp_carbon.ok:
-                    carbon_data = resp_carbon.json()
-                    carbon_intensity = carbon_data.get("carbonIntensity")
-                    logger.info(f"Fetched carbon intensity from dedicated endpoint: {carbon_intensity}")
-            except Exception as e_carbon:
-                logger.warning(f"Failed to fetch fallback carbon intensity: {e_carbon}")
+            carbon_intensity = _fetch_carbon_intensity(
+                endpoints.carbon_url, endpoints.headers, endpoints.params
+            )
 
         renewable_percentage = data.get("renewablePercentage")
 
         # Determine if solar is active (this is a heuristic)
-        # In a real app, we might check specifically for solar generation > threshold
-        generation = data.get("powerProductionBreakdown", {})
-        solar_gen = generation.get("solar", 0)
-        is_solar_available = solar_gen > 0
+        # In a real app, we might check specifically for solar generation > threshold.
+        # The API reports null for zones/sources without data, so treat falsy as 0.
+        generation = data.get("powerProductionBreakdown") or {}
+        is_solar_available = (generation.get("solar") or 0) > 0
 
         return {
             "carbon_intensity": carbon_intensity,
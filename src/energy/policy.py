@@ -6,7 +6,7 @@ from typing import Optional
 from energy.price_signal import EnergyStatus
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EnergyPolicy:
     """Simple policy layer mapping an energy signal to application behavior."""
 
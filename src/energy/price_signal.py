@@ -1,16 +1,27 @@
+import asyncio
+import atexit
 import logging
 import time
 import os
 from dataclasses import dataclass
 from typing import Optional
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from energy.electricity_maps import ElectricityMapsConfig, fetch_from_electricity_maps
 
 logger = logging.getLogger(__name__)
 
+# Reuses connections to the simulator. No retries: callers give the whole
+# fetch a short timeout and cache a failure rather than waiting on it.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+atexit.register(_SESSION.close)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class EnergyStatus:
     electricity_price_eur: Optional[float]
     solar_available: Optional[bool]
@@ -53,25 +64,46 @@ def fetch_energy_status(
 
     # 2. Fallback to local simulator
     try:
-        resp = requests.get(status_url, timeout=timeout_s)
+        resp = _SESSION.get(status_url, timeout=timeout_s)
+        resp.raise_for_status()
+        return _status_from_simulator(resp.json())
+    except Exception as e:
+        logger.warning("Energy status unavailable from simulator: %s", e)
+        return None
+
+
+async def afetch_energy_status(
+    client: httpx.AsyncClient, status_url: str, timeout_s: float = 1.0
+) -> Optional[EnergyStatus]:
+    """Async variant of fetch_energy_status using a shared httpx client.
+
+    The Electricity Maps path is still blocking and runs in a worker thread.
+    """
+    if os.getenv("ELECTRICITY_MAPS_API_KEY"):
+        return await asyncio.to_thread(fetch_energy_status, status_url, timeout_s)
+
+    try:
+        resp = await client.get(status_url, timeout=timeout_s)
         resp.raise_for_status()
-        payload = resp.json()
-
-        price = payload.get("electricity_price_eur")
-        solar_raw = payload.get("solar_available")
-
-        solar: Optional[bool]
-        if solar_raw is None:
-            solar = None
-        else:
-            solar = bool(int(solar_raw))
-
-        return EnergyStatus(
-            electricity_price_eur=float(price) if price is not None else None,
-            solar_available=solar,
-            fetched_at_unix_s=time.time(),
-            source="simulator",
-        )
+        return _status_from_simulator(resp.json())
     except Exception as e:
         logger.warning("Energy status unavailable from simulator: %s", e)
         return None
+
+
+def _status_from_simulator(payload: dict) -> EnergyStatus:
+    price = payload.get("electricity_price_eur")
+    solar_raw = payload.get("solar_available")
+
+    solar: Optional[bool]
+    if solar_raw is None:
+        solar = None
+    else:
+        solar = bool(int(solar_raw))
+
+    return EnergyStatus(
+        electricity_price_eur=float(price) if price is not None else None,
+        solar_available=solar,
+        fetched_at_unix_s=time.time(),
+        source="simulator",
+    )
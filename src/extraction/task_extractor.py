@@ -1,12 +1,18 @@
-import json
 import logging
 from typing import Optional
 
+import orjson
+from pydantic import TypeAdapter, ValidationError
+
 from planner_ai.models import Task
-from llm.llm_client import LLMClient
+from llm.concurrency import map_bounded
+from llm.llm_client import LLMClient, default_client
 
 logger = logging.getLogger(__name__)
 
+# Validates a whole list of task dicts in one pydantic-core call
+_TASKS_ADAPTER = TypeAdapter(list[Task])
+
 
 class TaskExtractor:
     """
@@ -15,7 +21,7 @@ class TaskExtractor:
     """
 
     def __init__(self, llm_client: Optional[LLMClient] = None):
-        self.llm_client = llm_client or LLMClient()
+        self.llm_client = llm_client or default_client()
 
     def _build_prompt(self, notes: str, llm_tier: str) -> str:
         """
@@ -23,6 +29,19 @@ class TaskExtractor:
         - Always request strict JSON output
         - Keep schema minimal to avoid hallucinated fields
         """
+        return f"{self._instruction(llm_tier)}\n\nNOTES:\n{notes}\n\nJSON:"
+
+    def _build_batch_prompt(self, notes: list[str], llm_tier: str) -> str:
+        """Prompt covering several numbered notes; tasks carry their note's index."""
+        numbered = "\n".join(f"[{i}]: {note}" for i, note in enumerate(notes))
+        return (
+            f"{self._instruction(llm_tier)}\n"
+            "The notes below are numbered [0], [1], ... "
+            'Add "note_index" (the note number) to every task.'
+            f"\n\nNOTES:\n{numbered}\n\nJSON:"
+        )
+
+    def _instruction(self, llm_tier: str) -> str:
         tier = (llm_tier or "large").strip().lower()
 
         if tier == "eco":
@@ -51,7 +70,7 @@ class TaskExtractor:
                 '{"tasks":[{"title": "...", "description": "", "fixed_time": "HH:MM" or null, "estimated_duration_min": 30, "priority": 3, "category": "work"}]}.'
             )
 
-        return f"{instruction}\n\nNOTES:\n{notes}\n\nJSON:"
+        return instruction
 
     def extract(self, text: str, llm_tier: str = "large") -> list[Task]:
         """
@@ -67,8 +86,8 @@ class TaskExtractor:
             return []
 
         try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             logger.warning("TaskExtractor: invalid JSON from LLM")
             return []
 
@@ -77,19 +96,67 @@ class TaskExtractor:
             logger.warning("TaskExtractor: JSON 'tasks' is not a list")
             return []
 
-        out: list[Task] = []
+        return self._to_tasks(tasks)
+
+    def extract_many(self, notes: list[str], llm_tier: str = "large") -> list[list[Task]]:
+        """
+        Extract tasks from several notes with a single LLM call.
+        Returns one task list per note, in order. If the batched answer cannot
+        be attributed to the notes, falls back to one extract() call per note,
+        run concurrently.
+        """
+        if len(notes) <= 1:
+            return [self.extract(text, llm_tier=llm_tier) for text in notes]
+
+        logger.info("TaskExtractor: extracting tasks from %d notes (tier=%s)", len(notes), llm_tier)
+
+        raw = self.llm_client.complete(self._build_batch_prompt(notes, llm_tier))
+        try:
+            tasks = orjson.loads(raw).get("tasks") if raw else None
+        except (orjson.JSONDecodeError, AttributeError):
+            tasks = None
+
+        grouped: Optional[list[list[dict]]] = None
+        if isinstance(tasks, list) and tasks:
+            grouped = [[] for _ in notes]
+            for t in tasks:
+                index = t.get("note_index") if isinstance(t, dict) else None
+                if not isinstance(index, int) or not 0 <= index < len(notes):
+                    grouped = None
+                    break
+                grouped[index].append(t)
+
+        if grouped is None:
+            logger.warning("TaskExtractor: batched extraction unusable, extracting notes one by one")
+            return map_bounded(
+                lambda text: self.extract(text, llm_tier=llm_tier),
+                notes,
+                fallback=lambda text: [],
+            )
+
+        return [self._to_tasks(items) for items in grouped]
+
+    def _to_tasks(self, tasks: list) -> list[Task]:
+        items: list[dict] = []
         for t in tasks:
             if not isinstance(t, dict) or not t.get("title"):
                 continue
 
-            t = dict(t)
             if t.get("description") is None:
-                t["description"] = ""
+                t = {**t, "description": ""}
+            items.append(t)
 
+        try:
+            return _TASKS_ADAPTER.validate_python(items)
+        except ValidationError:
+            pass
+
+        # If one task is malformed, skip it instead of failing the whole extraction
+        out: list[Task] = []
+        for t in items:
             try:
-                out.append(Task(**t))
-            except Exception:
-                # If one task is malformed, skip it instead of failing the whole extraction
+                out.append(Task.model_validate(t))
+            except ValidationError:
                 continue
 
         return out
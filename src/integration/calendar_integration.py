@@ -1,19 +1,69 @@
 from __future__ import annotations
 
+import importlib.util
 import logging
-from datetime import datetime
-from typing import Optional
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 from planner_ai.models import ScheduledTask
 
 logger = logging.getLogger(__name__)
 
-try:
-    from googleapiclient.discovery import build
+# Module alias: several methods take a `timezone` name argument
+_UTC = timezone.utc
+
+# Google's limit on requests per batch call
+SYNC_BATCH_SIZE = 50
+# Retries (with googleapiclient's exponential backoff) for single requests
+# that fail with 429 or 5xx; batch items are retried separately
+API_RETRIES = 2
+# Only the event attributes the schedule view reads
+EVENT_FIELDS = "items(id,status,summary,description,start,end),nextPageToken"
+
+# googleapiclient is imported on first use; it is slow to import and the
+# notes pipeline only constructs integrations without credentials
+GOOGLE_API_AVAILABLE = importlib.util.find_spec("googleapiclient") is not None
+
+if TYPE_CHECKING:
     from google.oauth2.credentials import Credentials
-except Exception:  # pragma: no cover
-    build = None
-    Credentials = None
+
+
+def _rfc3339_utc(dt: datetime) -> str:
+    """RFC 3339 UTC timestamp (YYYY-MM-DDTHH:MM:SSZ) of an aware datetime."""
+    if dt.tzinfo is None:
+        raise ValueError(f"naive datetime {dt!r}; pass an aware datetime")
+    return dt.astimezone(_UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _floating_iso(dt: datetime) -> str:
+    """YYYY-MM-DDTHH:MM:SS of dt with any tzinfo dropped (naive times as-is)."""
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+    return dt.isoformat()
+
+
+def _is_rate_limited(exception) -> bool:
+    """Whether a batch item failed with Google's 429 / rateLimitExceeded."""
+    status = getattr(getattr(exception, "resp", None), "status", None)
+    if status == 429:
+        return True
+    return status == 403 and "rateLimitExceeded" in str(exception)
+
+
+def _is_transient(exception) -> bool:
+    """Whether a failed write is worth retrying later (rate limit, 5xx, network)."""
+    status = getattr(getattr(exception, "resp", None), "status", None)
+    if status is None:
+        return True
+    return _is_rate_limited(exception) or status >= 500
+
+
+class SyncResult(NamedTuple):
+    # The input tasks in order, with calendar_event_id set for written events
+    tasks: list[ScheduledTask]
+    # Tasks whose write failed transiently; sync them again later
+    retry: list[ScheduledTask]
 
 
 class CalendarIntegration:
@@ -22,39 +72,77 @@ class CalendarIntegration:
     ):
         self.credentials = credentials
         self.calendar_id = calendar_id
+        # The built service (and its HTTP connection) is reused across calls.
+        # httplib2 is not thread-safe, so calls through it are serialized.
+        self._service = None
+        self._lock = threading.Lock()
+        # calendar_id -> timezone; a calendar's timezone practically never changes
+        self._timezones: dict[str, str] = {}
+
+    def _get_service(self):
+        if self._service is None:
+            from googleapiclient.discovery import build
+
+            # The bundled discovery document avoids fetching it over HTTP
+            self._service = build(
+                "calendar",
+                "v3",
+                credentials=self.credentials,
+                cache_discovery=False,
+                static_discovery=True,
+            )
+        return self._service
 
-    async def get_events(self, time_min: datetime, time_max: datetime) -> list[dict]:
+    def get_events(
+        self, time_min: datetime, time_max: datetime, expand: bool = True
+    ) -> list[dict]:
         """
         Fetch existing events in a time range.
+        Blocking; async callers should run it in an executor.
 
         Args:
-            time_min: Start time (inclusive)
-            time_max: End time (exclusive)
+            time_min: Start time (inclusive), timezone-aware
+            time_max: End time (exclusive), timezone-aware
+            expand: Expand recurring events into their instances (sorted by start)
 
         Returns:
             List of event dictionaries
         """
-        if build is None or self.credentials is None:
+        if not GOOGLE_API_AVAILABLE or self.credentials is None:
             logger.warning("Google Calendar API not available or credentials missing")
             return []
 
+        params = {
+            "calendarId": self.calendar_id,
+            "timeMin": _rfc3339_utc(time_min),
+            "timeMax": _rfc3339_utc(time_max),
+            "singleEvents": expand,
+            "fields": EVENT_FIELDS,
+            "maxResults": 2500,
+        }
+        if expand:
+            # Google only allows ordering by start time for expanded events
+            params["orderBy"] = "startTime"
+
         try:
-            service = build("calendar", "v3", credentials=self.credentials)
+            events: list[dict] = []
+            with self._lock:
+                service = self._get_service()
 
-            # Call the Calendar API
-            events_result = (
-                service.events()
-                .list(
-                    calendarId=self.calendar_id,
-                    timeMin=time_min.isoformat() + "Z",
-                    timeMax=time_max.isoformat() + "Z",
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
-            )
+                # Call the Calendar API, following pages until the range is covered
+                page_token = None
+                while True:
+                    events_result = (
+                        service.events()
+                        .list(pageToken=page_token, **params)
+                        .execute(num_retries=API_RETRIES)
+                    )
+                    events.extend(events_result.get("items", []))
+                    page_token = events_result.get("nextPageToken")
+                    if not page_token:
+                        break
 
-            return events_result.get("items", [])
+            return events
 
         except Exception as e:
             logger.error(f"Failed to fetch calendar events: {e}")
@@ -67,74 +155,167 @@ class CalendarIntegration:
         - Otherwise: create event and store returned id
         Safe no-op if Google client is unavailable or credentials are missing.
         """
+        return self.try_sync(scheduled_tasks).tasks
+
+    def try_sync(self, scheduled_tasks: list[ScheduledTask]) -> SyncResult:
+        """Like sync(), also reporting the tasks whose write should be retried."""
         if not scheduled_tasks:
-            return []
+            return SyncResult([], [])
 
-        if build is None or self.credentials is None:
-            return scheduled_tasks
+        if not GOOGLE_API_AVAILABLE or self.credentials is None:
+            return SyncResult(scheduled_tasks, [])
 
+        with self._lock:
+            return self._sync(scheduled_tasks)
+
+    def _sync(self, scheduled_tasks: list[ScheduledTask]) -> SyncResult:
         try:
-            service = build("calendar", "v3", credentials=self.credentials)
+            service = self._get_service()
         except Exception as e:
             logger.error(f"Failed to build Google Calendar service: {e}")
-            return scheduled_tasks
+            return SyncResult(scheduled_tasks, list(scheduled_tasks))
+
+        # Tasks whose request fails keep their original entry
+        updated: list[ScheduledTask] = list(scheduled_tasks)
 
-        updated: list[ScheduledTask] = []
-        
         # 1. Fetch Calendar Timezone
         # We need this to ensure that "13:00" means "13:00 in the user's calendar",
         # not "13:00 UTC" (which might be 8am or 9am for them).
-        calendar_tz = "UTC"
+        calendar_tz = self._get_calendar_timezone(service)
+
+        # Events that already match a task are left alone
+        existing: dict[tuple, str] = {}
         try:
-             calendar_tz = self._get_calendar_timezone(service)
-        except Exception:
-             pass
+            existing = self._existing_events(service, scheduled_tasks, calendar_tz)
+        except Exception as e:
+            logger.warning(f"Failed to list existing events, pushing all tasks: {e}")
 
-        for task in scheduled_tasks:
+        # (task index, event id to update or None, event body) of every task
+        # that needs a write; built up front so the batch loop only sends
+        pending: list[tuple[int, Optional[str], dict]] = []
+        for i, task in enumerate(scheduled_tasks):
             try:
                 event_body = self._to_event(task, timezone=calendar_tz)
+            except Exception as e:
+                logger.error(f"Failed to sync task {task.title}: {e}")
+                continue
 
-                if task.calendar_event_id:
-                    try:
-                        event = (
-                            service.events()
-                            .update(
-                                calendarId=self.calendar_id,
-                                eventId=task.calendar_event_id,
-                                body=event_body,
-                            )
-                            .execute()
-                        )
-                        updated.append(
-                            task.model_copy(
-                                update={"calendar_event_id": event.get("id")}
-                            )
-                        )
-                    except Exception as e:
-                        # If update fails (e.g., event deleted), try insert?
-                        # For now, just log and keep task as is, but maybe clear ID?
-                        logger.warning(
-                            f"Failed to update event {task.calendar_event_id}: {e}"
-                        )
-                        updated.append(task)
-                else:
-                    event = (
-                        service.events()
-                        .insert(
-                            calendarId=self.calendar_id,
-                            body=event_body,
-                        )
-                        .execute()
+            event_id = existing.get(self._event_key(event_body))
+            if event_id and task.calendar_event_id in (None, event_id):
+                updated[i] = task.model_copy(update={"calendar_event_id": event_id})
+                continue
+            pending.append((i, task.calendar_event_id, event_body))
+
+        failed: list[int] = []
+
+        def on_done(request_id: str, response: dict, exception) -> None:
+            i = int(request_id)
+            task = scheduled_tasks[i]
+            if exception is not None:
+                # Keep task unchanged on failure (e.g. the event was deleted)
+                logger.error(f"Failed to sync task {task.title}: {exception}")
+                # Rate-limited and other transient failures go back to the
+                # caller to retry, without holding the lock while backing off
+                if _is_transient(exception):
+                    failed.append(i)
+                return
+            updated[i] = task.model_copy(
+                update={"calendar_event_id": response.get("id")}
+            )
+
+        # 2. Send inserts/updates in batches, one HTTP round-trip per batch
+        self._send_batches(service, pending, on_done)
+
+        return SyncResult(updated, [scheduled_tasks[i] for i in sorted(failed)])
+
+    def _send_batches(
+        self,
+        service,
+        pending: list[tuple[int, Optional[str], dict]],
+        callback,
+    ) -> None:
+        """Send insert/update requests SYNC_BATCH_SIZE at a time."""
+        answered: set[str] = set()
+
+        def tracked(request_id: str, response: dict, exception) -> None:
+            answered.add(request_id)
+            callback(request_id, response, exception)
+
+        for offset in range(0, len(pending), SYNC_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=tracked)
+            for i, event_id, event_body in pending[offset : offset + SYNC_BATCH_SIZE]:
+                if event_id:
+                    request = service.events().update(
+                        calendarId=self.calendar_id,
+                        eventId=event_id,
+                        body=event_body,
                     )
-                    updated.append(
-                        task.model_copy(update={"calendar_event_id": event.get("id")})
+                else:
+                    request = service.events().insert(
+                        calendarId=self.calendar_id,
+                        body=event_body,
                     )
+                batch.add(request, request_id=str(i))
+
+            try:
+                batch.execute()
             except Exception as e:
-                logger.error(f"Failed to sync task {task.title}: {e}")
-                # Keep task unchanged on failure
-                updated.append(task)
+                # Requests the batch never answered fail with its error
+                logger.error(f"Failed to sync batch of calendar events: {e}")
+                for i, _, _ in pending[offset : offset + SYNC_BATCH_SIZE]:
+                    if str(i) not in answered:
+                        callback(str(i), None, e)
+
+    def _existing_events(
+        self, service, tasks: list[ScheduledTask], timezone: str
+    ) -> dict[tuple, str]:
+        """
+        Map events around the tasks' time span to their ids, keyed like _event_key.
 
-        return updated
+        One paged events.list over the whole span; times are requested in the
+        calendar timezone so they line up with the floating times we send.
+        """
+        # Pad by a day so the UTC bounds cover any calendar offset
+        span_start = min(t.start_time.replace(tzinfo=None) for t in tasks)
+        span_end = max(t.end_time.replace(tzinfo=None) for t in tasks)
+        time_min = _rfc3339_utc((span_start - timedelta(days=1)).replace(tzinfo=_UTC))
+        time_max = _rfc3339_utc((span_end + timedelta(days=1)).replace(tzinfo=_UTC))
+
+        existing: dict[tuple, str] = {}
+        page_token = None
+        while True:
+            result = (
+                service.events()
+                .list(
+                    calendarId=self.calendar_id,
+                    timeMin=time_min,
+                    timeMax=time_max,
+                    timeZone=timezone,
+                    singleEvents=True,
+                    maxResults=2500,
+                    pageToken=page_token,
+                )
+                .execute(num_retries=API_RETRIES)
+            )
+            for event in result.get("items", []):
+                if event.get("status") == "cancelled":
+                    continue
+                if "dateTime" not in event.get("start", {}):
+                    continue  # all-day events never match a task
+                existing[self._event_key(event)] = event["id"]
+
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return existing
+
+    @staticmethod
+    def _event_key(event: dict) -> tuple:
+        """(summary, start, end) with times cut to local YYYY-MM-DDTHH:MM:SS."""
+        return (
+            event.get("summary"),
+            event.get("start", {}).get("dateTime", "")[:19],
+            event.get("end", {}).get("dateTime", "")[:19],
+        )
 
     def _to_event(self, task: ScheduledTask, timezone: str = "UTC") -> dict:
         """
@@ -147,8 +328,8 @@ class CalendarIntegration:
         # Format as naive ISO string (YYYY-MM-DDTHH:MM:SS)
         # We strip tzinfo if present to ensure we send a "floating" time
         # paired with the explicit timeZone field.
-        start_naive = task.start_time.replace(tzinfo=None).isoformat()
-        end_naive = task.end_time.replace(tzinfo=None).isoformat()
+        start_naive = _floating_iso(task.start_time)
+        end_naive = _floating_iso(task.end_time)
 
         return {
             "summary": task.title,
@@ -165,31 +346,42 @@ class CalendarIntegration:
 
     def _get_calendar_timezone(self, service) -> str:
         """
-        Fetch the timezone of the target calendar.
-        Defaults to 'UTC' if fetching fails.
+        Fetch the timezone of the target calendar, once per instance.
+        Defaults to 'UTC' if fetching fails; failures are not remembered.
         """
+        cached = self._timezones.get(self.calendar_id)
+        if cached is not None:
+            return cached
         try:
-            calendar = service.calendars().get(calendarId=self.calendar_id).execute()
-            return calendar.get("timeZone", "UTC")
+            calendar = (
+                service.calendars()
+                .get(calendarId=self.calendar_id)
+                .execute(num_retries=API_RETRIES)
+            )
         except Exception as e:
             logger.warning(f"Failed to fetch calendar timezone: {e}")
             return "UTC"
+        timezone = calendar.get("timeZone", "UTC")
+        self._timezones[self.calendar_id] = timezone
+        return timezone
+
+    def invalidate_timezone_cache(self) -> None:
+        """Forget fetched calendar timezones (e.g. after the user changes it)."""
+        self._timezones.clear()
 
-    async def update_event(self, event_id: str, patch_data: dict) -> dict:
+    def update_event(self, event_id: str, patch_data: dict) -> dict:
         """
         Update an existing event with patch semantics.
+        Blocking; async callers should run it in an executor.
         """
-        if build is None or self.credentials is None:
+        if not GOOGLE_API_AVAILABLE or self.credentials is None:
             raise RuntimeError("Google Calendar API not available")
 
-        # Running blocking call in executor if needed, but for now direct is ok 
-        # as this is usually called from async loop wrapper or simple endpoint.
-        # Actually Google client is blocking.
-        
-        service = build("calendar", "v3", credentials=self.credentials)
-        updated_event = service.events().patch(
-            calendarId=self.calendar_id,
-            eventId=event_id,
-            body=patch_data
-        ).execute()
+        with self._lock:
+            service = self._get_service()
+            updated_event = service.events().patch(
+                calendarId=self.calendar_id,
+                eventId=event_id,
+                body=patch_data
+            ).execute(num_retries=API_RETRIES)
         return updated_event
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+
+# Entries kept per process; 0 disables caching
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+
+
+def cache_key(*parts: Any) -> str:
+    """Content hash of JSON-able parts (prompt, model, ...)."""
+    raw = orjson.dumps(parts, default=str, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    Small LRU of parsed LLM results.
+    Locked because the notes pipeline runs in worker threads.
+    """
+
+    def __init__(self, maxsize: int = LLM_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[list[dict[str, Any]]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                return None
+            self._data.move_to_end(key)
+        # Callers may mutate the dicts they get back
+        return [dict(item) for item in value]
+
+    def put(self, key: str, value: list[dict[str, Any]]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = [dict(item) for item in value]
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Concurrent LLM calls per process, and an optional provider rate limit
+LLM_CONCURRENCY = int(os.getenv("PLANNER_LLM_CONCURRENCY", "8"))
+LLM_RATE_PER_MINUTE = float(os.getenv("PLANNER_LLM_RATE_PER_MINUTE", "0"))  # 0 = no limit
+
+
+class TokenBucket:
+    """Blocking token bucket: acquire() returns once a call may be made."""
+
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_bucket: Optional[TokenBucket] = (
+    TokenBucket(LLM_RATE_PER_MINUTE, capacity=max(1, LLM_CONCURRENCY))
+    if LLM_RATE_PER_MINUTE > 0
+    else None
+)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Set on threads while they run a map_bounded item
+_local = threading.local()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, LLM_CONCURRENCY), thread_name_prefix="llm"
+            )
+        return _executor
+
+
+def map_bounded(
+    fn: Callable[[T], R],
+    items: list[T],
+    fallback: Callable[[T], R],
+    retries: int = 2,
+    backoff_s: float = 0.5,
+) -> list[R]:
+    """
+    Run fn over items on the shared LLM threads, keeping input order.
+    A failing item is retried with exponential backoff, then replaced by
+    fallback(item) so one bad call does not fail the whole batch.
+    """
+
+    def call(item: T) -> R:
+        _local.in_pool = True
+        for attempt in range(retries + 1):
+            if _bucket is not None:
+                _bucket.acquire()
+            try:
+                return fn(item)
+            except Exception as e:
+                if attempt == retries:
+                    logger.warning(f"LLM call failed after {retries + 1} attempts: {e}")
+                    return fallback(item)
+                time.sleep(backoff_s * 2**attempt)
+        return fallback(item)  # unreachable; keeps type checkers happy
+
+    if getattr(_local, "in_pool", False):
+        # Nested call from a pool thread: waiting on the same pool could
+        # deadlock once every thread is blocked, so run the items here
+        return [call(item) for item in items]
+    return list(_get_executor().map(call, items))
@@ -1,11 +1,15 @@
 from __future__ import annotations
+import atexit
 import json
 import os
 import re
+from functools import lru_cache
 from typing import Any, Optional
 
+import orjson
 from pydantic import ValidationError
 
+from llm.cache import ResponseCache, cache_key
 from llm.schemas import (
     TaskExtractionResult,
     TaskClassificationResult,
@@ -20,6 +24,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Parsed results of successful calls, shared by all clients in the process
+_response_cache = ResponseCache()
+
 JSON_ONLY_RULES = """
 Return ONLY valid JSON. No markdown. No commentary. No code fences.
 Do NOT use trailing commas. Do NOT use comments inside the JSON (like // or /* */).
@@ -28,28 +35,37 @@ If unsure, return {"tasks": []}.
 
 
 
-def _extract_json(text: str) -> str:
-    """
-    Robust-ish: tries to extract a JSON object from model output.
-    Works even if model adds some stray text.
-    """
-    # Remove C-style comments //...
-    text = re.sub(r'//.*$', '', text, flags=re.MULTILINE)
+_decoder = json.JSONDecoder()
+
+# A JSON string (kept) or a // or /* */ comment (dropped), in one pass
+_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
 
-    text = text.strip()
 
-    # already JSON
-    if text.startswith("{") and text.endswith("}"):
-        return text
+def _strip_comments(text: str) -> str:
+    """Remove // and /* */ comments outside of JSON strings."""
+    return _COMMENT_RE.sub(lambda m: m.group(1) or "", text)
 
-    # try to find first {...} block
+
+def _extract_json_obj(text: str) -> Any:
+    """
+    Robust-ish: decodes the first JSON object in model output.
+    Works even if model adds some stray text; returns {} if there is none.
+    Raises json.JSONDecodeError when the object itself is malformed.
+    """
     start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return text[start : end + 1]
+    if start == -1:
+        # give up
+        return {}
+
+    # Decode from the first brace; trailing chatter is simply not consumed
+    try:
+        return _decoder.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        if "//" not in text and "/*" not in text:
+            raise
 
-    # give up
-    return "{}"
+    # Models sometimes comment their JSON despite being told not to
+    return _decoder.raw_decode(_strip_comments(text[start:]))[0]
 
 
 class LLMClient:
@@ -58,6 +74,16 @@ class LLMClient:
         self.large_model = os.getenv("LLM_MODEL_LARGE", "llama3.1").strip()
         self.small_model = os.getenv("LLM_MODEL_SMALL", "llama3.2:1b").strip()
 
+    def _cache_key(self, system: str, user: str, model: str) -> Optional[str]:
+        """
+        Key for a call's result, or None when the provider is not cacheable.
+        Only providers exposing cache_id (the real network backends) qualify.
+        """
+        provider_id = getattr(self.provider, "cache_id", None)
+        if provider_id is None:
+            return None
+        return cache_key(provider_id, model, system, user)
+
     def _build_provider(self) -> LLMProvider:
         name = os.getenv("LLM_PROVIDER", "openai").strip().lower()
         if name == "openai":
@@ -75,7 +101,7 @@ class LLMClient:
             Returns JSON string: {"tasks":[...]}.
             """
             tasks = self.extract_tasks(note_text)  # list[dict[str, Any]]
-            return json.dumps({"tasks": tasks}, ensure_ascii=False)
+            return orjson.dumps({"tasks": tasks}, default=str).decode()
 
     def extract_tasks(self, note_text: str, llm_tier: str = "large") -> list[dict[str, Any]]:
         """
@@ -114,6 +140,12 @@ NOTE TEXT:
         model_name = self.large_model if llm_tier == "large" else self.small_model
         # logger.info(f"Using model: {model_name} for tier: {llm_tier}")
 
+        key = self._cache_key(system, user, model_name)
+        if key is not None:
+            cached = _response_cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
             try:
                 raw = self.provider.generate(system=system, user=user, model=model_name)
@@ -121,9 +153,12 @@ NOTE TEXT:
                 # FakeProvider doesn't accept `model`
                 raw = self.provider.generate(system=system, user=user)
 
-            json_text = _extract_json(raw)
-            parsed = TaskExtractionResult.model_validate_json(json_text)
-            return [t.model_dump() for t in parsed.tasks]
+            # Validate the decoded object rather than re-parsing its text
+            parsed = TaskExtractionResult.model_validate(_extract_json_obj(raw))
+            result = [t.model_dump() for t in parsed.tasks]
+            if key is not None:
+                _response_cache.put(key, result)
+            return result
 
         except (ValidationError, json.JSONDecodeError) as e:
             logger.error(f"Error extracting tasks: {e}. Raw output: {raw if 'raw' in locals() else 'N/A'}")
@@ -159,19 +194,28 @@ Rules:
 - if unclear, category="other", priority=3
 
 TASKS:
-{json.dumps(tasks, ensure_ascii=False, default=str)}
+{orjson.dumps(tasks, default=str).decode()}
 """.strip()
         
         model_name = self.large_model if llm_tier == "large" else self.small_model
 
+        key = self._cache_key(system, user, model_name)
+        if key is not None:
+            cached = _response_cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
             try:
                 raw = self.provider.generate(system=system, user=user, model=model_name)
             except TypeError:
                 raw = self.provider.generate(system=system, user=user)
-            json_text = _extract_json(raw)
-            parsed = TaskClassificationResult.model_validate_json(json_text)
-            return [t.model_dump() for t in parsed.tasks]
+            parsed = TaskClassificationResult.model_validate(_extract_json_obj(raw))
+            result = [t.model_dump() for t in parsed.tasks]
+            # Fallback results below are never cached
+            if key is not None:
+                _response_cache.put(key, result)
+            return result
         except (ValidationError, json.JSONDecodeError, Exception):
             # fallback: return unchanged, with defaults if missing
             out: list[dict[str, Any]] = []
@@ -181,3 +225,14 @@ TASKS:
                 t.setdefault("priority", 3)
                 out.append(t)
             return out
+
+
+@lru_cache(maxsize=1)
+def default_client() -> LLMClient:
+    """Process-wide LLMClient used when a component is not given one."""
+    client = LLMClient()
+    # The provider's pooled connections live as long as the process
+    close = getattr(client.provider, "close", None)
+    if close is not None:
+        atexit.register(close)
+    return client
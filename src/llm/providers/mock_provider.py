@@ -1,7 +1,45 @@
 from __future__ import annotations
 import json
+import re
 from llm.providers.base import LLMProvider
 
+# Canned extraction answer, serialized once
+_EXTRACTION_RESPONSE = json.dumps({
+    "tasks": [
+        {
+            "title": "Finish the quarterly report",
+            "description": "Complete the financial section for Sarah",
+            "estimated_duration_min": 60,
+            "deadline": None
+        },
+        {
+            "title": "Call mom",
+            "description": "Ask about Sunday dinner",
+            "estimated_duration_min": 15,
+            "deadline": None
+        },
+        {
+            "title": "Go for a run",
+            "description": "30 min jog in the park",
+            "estimated_duration_min": 30,
+            "deadline": None
+        }
+    ]
+})
+
+# Demo keywords, matched as substrings in one scan; earlier categories win
+_KEYWORD_RE = re.compile(r"mom|dinner|run|gym|read|study", re.IGNORECASE)
+_KEYWORD_CATEGORY = {
+    "mom": "personal",
+    "dinner": "personal",
+    "run": "health",
+    "gym": "health",
+    "read": "learning",
+    "study": "learning",
+}
+_CATEGORY_RANK = {"personal": 0, "health": 1, "learning": 2}
+
+
 class MockProvider(LLMProvider):
     def generate(self, *, system: str, user: str, model: str | None = None) -> str:
         """
@@ -9,40 +47,16 @@ class MockProvider(LLMProvider):
         """
         # Check if it's an extraction request (look for keywords in user prompt)
         if "Extract tasks" in user:
-            return json.dumps({
-                "tasks": [
-                    {
-                        "title": "Finish the quarterly report",
-                        "description": "Complete the financial section for Sarah",
-                        "estimated_duration_min": 60,
-                        "deadline": None
-                    },
-                    {
-                        "title": "Call mom",
-                        "description": "Ask about Sunday dinner",
-                        "estimated_duration_min": 15,
-                        "deadline": None
-                    },
-                    {
-                        "title": "Go for a run",
-                        "description": "30 min jog in the park",
-                        "estimated_duration_min": 30,
-                        "deadline": None
-                    }
-                ]
-            })
+            return _EXTRACTION_RESPONSE
         
         # Check if it's a classification request
         if "Classify this task" in user:
             # Simple keyword matching for demo purposes
-            lower_user = user.lower()
-            category = "work"
-            if "mom" in lower_user or "dinner" in lower_user:
-                category = "personal"
-            elif "run" in lower_user or "gym" in lower_user:
-                category = "health"
-            elif "read" in lower_user or "study" in lower_user:
-                category = "learning"
+            category = min(
+                (_KEYWORD_CATEGORY[m.lower()] for m in _KEYWORD_RE.findall(user)),
+                key=_CATEGORY_RANK.__getitem__,
+                default="work",
+            )
                 
             return json.dumps({
                 "category": category,
@@ -7,9 +7,19 @@ class OllamaProvider(LLMProvider):
     def __init__(self):
         self.model = os.getenv("OLLAMA_MODEL", "llama3.1").strip()
         self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").strip()
+        # Identifies this backend in the LLMClient response cache
+        self.cache_id = f"ollama:{self.base_url}:{self.model}"
+        # Pooled keep-alive connections to the Ollama server
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+
+    def close(self) -> None:
+        self._client.close()
 
     def generate(self, *, system: str, user: str, model: str | None = None) -> str:
-        url = f"{self.base_url}/api/chat"
         payload = {
             "model": model or self.model,
             "stream": False,
@@ -20,9 +30,8 @@ class OllamaProvider(LLMProvider):
             "options": {"temperature": 0.2},
         }
 
-        with httpx.Client(timeout=60.0) as client:
-            r = client.post(url, json=payload)
-            r.raise_for_status()
-            data = r.json()
+        r = self._client.post("/api/chat", json=payload)
+        r.raise_for_status()
+        data = r.json()
 
         return data["message"]["content"]
@@ -8,16 +8,24 @@ class OpenAIProvider(LLMProvider):
         self.api_key = os.getenv("OPENAI_API_KEY", "").strip()
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini").strip()
         self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").strip()
+        # Identifies this backend in the LLMClient response cache
+        self.cache_id = f"openai:{self.base_url}:{self.model}"
 
         if not self.api_key:
             raise RuntimeError("OPENAI_API_KEY is missing")
 
+        # Pooled keep-alive connections, so calls after the first skip the TLS handshake
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
     def generate(self, *, system: str, user: str, model: str | None = None) -> str:
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": model or self.model,
             "messages": [
@@ -27,9 +35,8 @@ class OpenAIProvider(LLMProvider):
             "temperature": 0.2,
         }
 
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, headers=headers, json=payload)
-            r.raise_for_status()
-            data = r.json()
+        r = self._client.post("/chat/completions", json=payload)
+        r.raise_for_status()
+        data = r.json()
 
         return data["choices"][0]["message"]["content"]
@@ -8,6 +8,8 @@ class ExtractedTask(BaseModel):
     description: Optional[str] = None
     estimated_duration_min: int = Field(default=30, gt=0)
     deadline: Optional[datetime] = None
+    # Set by batched extraction: which of the numbered notes the task came from
+    note_index: Optional[int] = None
 
 class TaskExtractionResult(BaseModel):
     tasks: List[ExtractedTask] = Field(default_factory=list)
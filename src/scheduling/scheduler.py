@@ -5,7 +5,7 @@ from datetime import datetime, timedelta, time
 from typing import Optional
 
 from planner_ai.models import Task, ScheduledTask, UserPreferences, DailyRoutine
-from storage.preferences_store import PreferencesStore
+from storage.preferences_store import PreferencesStore, default_preferences_store
 from storage.routine_store import RoutineStore
 
 
@@ -21,7 +21,7 @@ class Scheduler:
         preferences_store: Optional[PreferencesStore] = None,
         routine_store: Optional[RoutineStore] = None,
     ):
-        self.preferences_store = preferences_store or PreferencesStore()
+        self.preferences_store = preferences_store or default_preferences_store()
         self.routine_store = routine_store or RoutineStore()
 
     def schedule(self, tasks: list[Task], day: Optional[datetime] = None) -> list[ScheduledTask]:
@@ -73,9 +73,10 @@ class Scheduler:
                 dur_min = int(t.estimated_duration_min or 30)
                 end_dt = start_dt + timedelta(minutes=dur_min)
                 
+                # t is a validated Task: its field dict feeds ScheduledTask directly
                 scheduled.append(
                     ScheduledTask(
-                        **t.model_dump(),
+                        **t.__dict__,
                         start_time=start_dt,
                         end_time=end_dt,
                     )
@@ -103,7 +104,7 @@ class Scheduler:
 
             scheduled.append(
                 ScheduledTask(
-                    **t.model_dump(),
+                    **t.__dict__,
                     start_time=start,
                     end_time=end,
                 )
@@ -7,10 +7,11 @@ Items are queued when energy is expensive and processed when conditions improve.
 
 import json
 import logging
+import time
 import uuid
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Any
+from typing import Optional, List, AsyncIterator
 
 from storage import db
 
@@ -85,17 +86,34 @@ class DurableQueue:
     - Status tracking and monitoring
     """
     
-    def __init__(self, worker_id: Optional[str] = None):
+    def __init__(
+        self, worker_id: Optional[str] = None, pending_count_ttl_s: float = 5.0
+    ):
         """
         Initialize the durable queue.
         
         Args:
             worker_id: Unique identifier for this worker instance.
                       If not provided, a UUID will be generated.
+            pending_count_ttl_s: How long get_pending_count may serve its
+                      in-process count before re-counting in the database.
         """
         self.worker_id = worker_id or str(uuid.uuid4())[:8]
+        self.pending_count_ttl_s = pending_count_ttl_s
+        # Adjusted by this instance's own transitions in between re-counts;
+        # other replicas only become visible on the next re-count.
+        self._pending_count: Optional[int] = None
+        self._pending_count_at = 0.0
         logger.info(f"DurableQueue initialized with worker_id: {self.worker_id}")
     
+    def _set_pending_count(self, count: int) -> None:
+        self._pending_count = count
+        self._pending_count_at = time.monotonic()
+    
+    def _adjust_pending_count(self, delta: int) -> None:
+        if self._pending_count is not None:
+            self._pending_count = max(0, self._pending_count + delta)
+    
     async def enqueue(
         self,
         notes: str,
@@ -137,9 +155,59 @@ class DurableQueue:
             max_attempts,
         )
         
+        self._adjust_pending_count(1)
         logger.info(f"Enqueued item {item_id} (notes: {notes[:30]}...)")
         return str(item_id)
     
+    async def enqueue_and_count(
+        self,
+        notes: str,
+        energy_price_eur: Optional[float] = None,
+        solar_available: Optional[bool] = None,
+        llm_tier: Optional[str] = None,
+        max_attempts: int = 3,
+    ) -> tuple[str, int]:
+        """
+        Add an item to the queue and count pending items in one round-trip.
+        
+        Args:
+            Same as enqueue()
+        
+        Returns:
+            Tuple of (UUID of the queued item, pending count including it)
+        """
+        # The count runs on the statement's snapshot, which does not yet
+        # include the row inserted by the CTE, hence the + 1.
+        query = """
+            WITH ins AS (
+                INSERT INTO queue_items (
+                    notes,
+                    submitted_energy_price_eur,
+                    submitted_solar_available,
+                    submitted_llm_tier,
+                    max_attempts
+                ) VALUES ($1, $2, $3, $4, $5)
+                RETURNING id
+            )
+            SELECT
+                (SELECT id FROM ins) AS id,
+                (SELECT COUNT(*) FROM queue_items WHERE status = 'pending') + 1
+                    AS pending_count
+        """
+        
+        row = await db.fetchrow(
+            query,
+            notes,
+            energy_price_eur,
+            solar_available,
+            llm_tier,
+            max_attempts,
+        )
+        
+        self._set_pending_count(row["pending_count"])
+        logger.info(f"Enqueued item {row['id']} (notes: {notes[:30]}...)")
+        return str(row["id"]), row["pending_count"]
+    
     async def dequeue(self) -> Optional[DequeueResult]:
         """
         Atomically dequeue the next pending item.
@@ -157,6 +225,7 @@ class DurableQueue:
         if record is None or record["item_id"] is None:
             return None
         
+        self._adjust_pending_count(-1)
         result = DequeueResult(
             id=str(record["item_id"]),
             notes=record["item_notes"],
@@ -225,6 +294,8 @@ class DurableQueue:
         query = "SELECT fail_item($1, $2)"
         
         new_status = await db.fetchval(query, uuid.UUID(item_id), error)
+        if new_status == "pending":
+            self._adjust_pending_count(1)
         
         logger.warning(f"Failed item {item_id}: {error} (new status: {new_status})")
         return new_status
@@ -248,6 +319,8 @@ class DurableQueue:
         count = await db.fetchval(query, timeout_minutes)
         
         if count > 0:
+            # Recovered items may have gone to pending or dead; re-count
+            self._pending_count = None
             logger.warning(f"Recovered {count} stale items")
         
         return count
@@ -282,9 +355,22 @@ class DurableQueue:
         return stats
     
     async def get_pending_count(self) -> int:
-        """Get the number of pending items."""
+        """
+        Get the number of pending items.
+        
+        Served from the in-process count while it is younger than
+        pending_count_ttl_s, otherwise re-counted in the database.
+        """
+        if (
+            self._pending_count is not None
+            and time.monotonic() - self._pending_count_at < self.pending_count_ttl_s
+        ):
+            return self._pending_count
+        
         query = "SELECT COUNT(*) FROM queue_items WHERE status = 'pending'"
-        return await db.fetchval(query)
+        count = await db.fetchval(query)
+        self._set_pending_count(count)
+        return count
     
     async def get_item(self, item_id: str) -> Optional[QueueItem]:
         """
@@ -305,6 +391,23 @@ class DurableQueue:
         
         return QueueItem.from_record(record)
     
+    async def get_item_json(self, item_id: str) -> Optional[str]:
+        """
+        Get a specific item as a JSON document rendered by PostgreSQL.
+        
+        The row is serialized server-side with to_jsonb, so callers can
+        return it to clients without building a dict in Python.
+        
+        Args:
+            item_id: The UUID of the item
+        
+        Returns:
+            JSON text of the item if found, None otherwise
+        """
+        query = "SELECT to_jsonb(q)::text FROM queue_items q WHERE q.id = $1"
+        
+        return await db.fetchval(query, uuid.UUID(item_id))
+    
     async def get_recent_items(
         self,
         limit: int = 20,
@@ -338,6 +441,48 @@ class DurableQueue:
         
         return [QueueItem.from_record(r) for r in records]
     
+    async def iter_recent_items(
+        self,
+        limit: int = 20,
+        status: Optional[str] = None,
+        prefetch: int = 100,
+    ) -> AsyncIterator[QueueItem]:
+        """
+        Iterate over recent queue items through a server-side cursor.
+        
+        Same selection as get_recent_items, but rows are fetched `prefetch`
+        at a time instead of all at once.
+        
+        Args:
+            limit: Maximum number of items to return
+            status: Filter by status (optional)
+            prefetch: Rows fetched per cursor round-trip
+        
+        Yields:
+            QueueItem objects, newest first
+        """
+        if status:
+            query = """
+                SELECT * FROM queue_items 
+                WHERE status = $1::queue_status
+                ORDER BY created_at DESC 
+                LIMIT $2
+            """
+            args = (status, limit)
+        else:
+            query = """
+                SELECT * FROM queue_items 
+                ORDER BY created_at DESC 
+                LIMIT $1
+            """
+            args = (limit,)
+        
+        # asyncpg cursors only exist inside a transaction
+        async with db.get_connection() as conn:
+            async with conn.transaction():
+                async for record in conn.cursor(query, *args, prefetch=prefetch):
+                    yield QueueItem.from_record(record)
+    
     async def get_dead_letter_items(self, limit: int = 50) -> List[QueueItem]:
         """Get items in the dead letter queue."""
         return await self.get_recent_items(limit=limit, status="dead")
@@ -368,6 +513,7 @@ class DurableQueue:
         success = result == "UPDATE 1"
         
         if success:
+            self._adjust_pending_count(1)
             logger.info(f"Retried dead item {item_id}")
         
         return success
@@ -382,13 +528,15 @@ class DurableQueue:
         Returns:
             Number of items deleted
         """
+        # Single set-based DELETE (served by idx_queue_completed_at); the
+        # affected row count comes back in the command status.
         query = """
             DELETE FROM queue_items
             WHERE status = 'completed'
-              AND completed_at < NOW() - ($1 || ' hours')::INTERVAL
+              AND completed_at < NOW() - make_interval(hours => $1)
         """
         
-        result = await db.execute(query, str(older_than_hours))
+        result = await db.execute(query, older_than_hours)
         
         # Parse "DELETE N" to get count
         try:
@@ -407,6 +555,7 @@ class DurableQueue:
         query = "DELETE FROM queue_items WHERE id = $1"
         try:
              result = await pool.execute(query, item_id)
+             self._pending_count = None
              # execute returns e.g. "DELETE 1"
              return "DELETE 1" in result
         except Exception as e:
@@ -1,8 +1,7 @@
 import logging
 import os
-import json
 from typing import Optional
-from datetime import datetime, timezone
+from datetime import timezone
 
 from cryptography.fernet import Fernet
 from google.oauth2.credentials import Credentials
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 from datetime import time
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from planner_ai.models import UserPreferences
 
@@ -19,15 +21,38 @@ def _str_to_time(s: str) -> time:
 class PreferencesStore:
     def __init__(self, path: str = "data/preferences.json"):
         self.path = Path(path)
+        # (file signature, parsed prefs) of the last load
+        self._cached: Optional[tuple[tuple, UserPreferences]] = None
+
+    def _signature(self) -> tuple:
+        """(mtime_ns, size) of the file, or () when it does not exist."""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return ()
+        return (st.st_mtime_ns, st.st_size)
 
     def load(self) -> UserPreferences:
+        """
+        Load preferences from disk. Returns defaults if file is missing or invalid.
+        The file is only re-read when its mtime or size changed since the last load;
+        each call returns a deep copy, so callers cannot alter the cached model.
+        """
+        signature = self._signature()
+        cached = self._cached
+        if cached is not None and cached[0] == signature:
+            return cached[1].model_copy(deep=True)
+
         try:
-            if not self.path.exists():
-                return UserPreferences()
-            data = json.loads(self.path.read_text(encoding="utf-8"))
-            return UserPreferences(**data)
+            if not signature:
+                prefs = UserPreferences()
+            else:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                prefs = UserPreferences(**data)
         except Exception:
-            return UserPreferences()
+            prefs = UserPreferences()
+        self._cached = (signature, prefs)
+        return prefs.model_copy(deep=True)
 
     def save(self, prefs: UserPreferences) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
@@ -38,3 +63,10 @@ class PreferencesStore:
             json.dumps(data, ensure_ascii=False, indent=2),
             encoding="utf-8",
         )
+        self._cached = None
+
+
+@lru_cache(maxsize=1)
+def default_preferences_store() -> PreferencesStore:
+    """Process-wide PreferencesStore used when a component is not given one."""
+    return PreferencesStore()
@@ -59,6 +59,7 @@ CREATE TABLE IF NOT EXISTS queue_items (
 CREATE INDEX IF NOT EXISTS idx_queue_status ON queue_items(status);
 CREATE INDEX IF NOT EXISTS idx_queue_pending_created ON queue_items(created_at) WHERE status = 'pending';
 CREATE INDEX IF NOT EXISTS idx_queue_processing ON queue_items(processing_started_at) WHERE status = 'processing';
+CREATE INDEX IF NOT EXISTS idx_queue_completed_at ON queue_items(completed_at) WHERE status = 'completed';
 
 -- Function to update the updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
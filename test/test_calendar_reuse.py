@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from api import state
+from api.dependencies import get_calendar_integration
+
+
+def test_calendar_integration_reused_while_refresh_token_unchanged(monkeypatch):
+    monkeypatch.setattr(state, "calendar_integrations", {})
+
+    first = get_calendar_integration(SimpleNamespace(token="a", refresh_token="r1"))
+    again = get_calendar_integration(SimpleNamespace(token="b", refresh_token="r1"))
+    other = get_calendar_integration(SimpleNamespace(token="c", refresh_token="r2"))
+
+    assert again is first
+    assert other is not first
+
+
+def test_calendar_integration_cached_per_user(monkeypatch):
+    monkeypatch.setattr(state, "calendar_integrations", {})
+
+    creds = SimpleNamespace(token="a", refresh_token="r1")
+    alice = get_calendar_integration(creds, "alice")
+    bob = get_calendar_integration(creds, "bob")
+
+    assert alice is not bob
+    assert get_calendar_integration(creds, "alice") is alice
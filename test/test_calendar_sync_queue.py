@@ -0,0 +1,68 @@
+import asyncio
+import dataclasses
+from collections import deque
+
+import pytest
+
+from api import state, workers
+from integration.calendar_integration import SyncResult
+
+
+def test_enqueue_calendar_sync_is_all_or_none(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(state, "calendar_sync_queue", asyncio.Queue(maxsize=3))
+        state.enqueue_calendar_sync(["a", "b"])
+        with pytest.raises(asyncio.QueueFull):
+            state.enqueue_calendar_sync(["c", "d"])
+        return state.calendar_sync_queue.qsize()
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_calendar_sync_overflow_is_dead_lettered(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(state, "calendar_sync_queue", asyncio.Queue(maxsize=2))
+        monkeypatch.setattr(state, "calendar_sync_dead_letter", deque())
+        dead = state.enqueue_calendar_sync_or_dead_letter(["a", "b", "c"])
+        return dead, state.calendar_sync_queue.qsize()
+
+    assert asyncio.run(scenario()) == (1, 2)
+    assert list(state.calendar_sync_dead_letter) == ["c"]
+
+
+def test_failed_calendar_batch_is_retried_then_dead_lettered(monkeypatch):
+    calls = []
+
+    class FakeAuthStore:
+        async def get_credentials(self, user_id):
+            return object()
+
+    class FlakyIntegration:
+        def try_sync(self, tasks):
+            calls.append(list(tasks))
+            # t1 always fails transiently, t2 only on the first attempt
+            return SyncResult(list(tasks), [t for t in tasks if t == "t1" or len(calls) == 1])
+
+    async def run_inline(fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(state, "google_auth_store", FakeAuthStore())
+    monkeypatch.setattr(state, "calendar_sync_dead_letter", deque())
+    monkeypatch.setattr(
+        workers, "get_calendar_integration", lambda creds, uid: FlakyIntegration()
+    )
+    monkeypatch.setattr(workers, "run_calendar_call", run_inline)
+    monkeypatch.setattr(
+        workers,
+        "settings",
+        dataclasses.replace(
+            workers.settings,
+            calendar_sync_max_attempts=3,
+            calendar_sync_flush_interval_s=0,
+        ),
+    )
+
+    asyncio.run(workers._sync_calendar_batch(["t1", "t2"]))
+
+    assert calls == [["t1", "t2"], ["t1", "t2"], ["t1"]]
+    assert list(state.calendar_sync_dead_letter) == ["t1"]
@@ -0,0 +1,35 @@
+import asyncio
+
+from storage import durable_queue as dq_mod
+from storage.durable_queue import DurableQueue
+
+
+def test_pending_count_served_in_process_between_recounts(monkeypatch):
+    counts = []
+
+    async def fake_fetchval(query, *args):
+        counts.append(query)
+        return 4
+
+    async def fake_fetchrow(query, *args):
+        return {
+            "item_id": "00000000-0000-0000-0000-000000000001",
+            "item_notes": "n",
+            "item_attempts": 1,
+            "item_submitted_llm_tier": "small",
+        }
+
+    monkeypatch.setattr(dq_mod.db, "fetchval", fake_fetchval)
+    monkeypatch.setattr(dq_mod.db, "fetchrow", fake_fetchrow)
+
+    async def run():
+        queue = DurableQueue(worker_id="w", pending_count_ttl_s=60)
+        first = await queue.get_pending_count()
+        await queue.dequeue()
+        second = await queue.get_pending_count()
+        queue.pending_count_ttl_s = 0
+        third = await queue.get_pending_count()
+        return first, second, third
+
+    assert asyncio.run(run()) == (4, 3, 4)
+    assert len(counts) == 2
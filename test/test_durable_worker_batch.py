@@ -0,0 +1,47 @@
+import asyncio
+import dataclasses
+
+import pytest
+
+from api import state, workers
+
+
+class FakeQueue:
+    def __init__(self, n):
+        self.items = list(range(n))
+
+    async def get_pending_count(self):
+        return len(self.items)
+
+    async def dequeue(self):
+        return self.items.pop(0) if self.items else None
+
+
+def test_worker_drains_a_batch_per_energy_check(monkeypatch):
+    energy_checks = []
+    processed = []
+
+    async def fake_status():
+        energy_checks.append(len(fake_queue.items))
+        return None
+
+    async def fake_process_one(item, llm_tier, status):
+        processed.append(item)
+
+    async def stop(timeout):
+        raise asyncio.CancelledError
+
+    fake_queue = FakeQueue(5)
+    monkeypatch.setattr(state, "durable_queue", fake_queue)
+    monkeypatch.setattr(state, "wait_for_queue", stop)
+    monkeypatch.setattr(workers, "get_energy_status", fake_status)
+    monkeypatch.setattr(workers, "_process_one", fake_process_one)
+    monkeypatch.setattr(
+        workers, "settings", dataclasses.replace(workers.settings, queue_batch_size=3)
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(workers._durable_queue_worker())
+
+    assert processed == [0, 1, 2, 3, 4]
+    assert energy_checks == [5, 2]
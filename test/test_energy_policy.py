@@ -0,0 +1,22 @@
+from energy.policy import EnergyPolicy
+from energy.price_signal import EnergyStatus
+
+
+def _status(price, solar):
+    return EnergyStatus(electricity_price_eur=price, solar_available=solar, fetched_at_unix_s=0.0)
+
+
+def test_should_process_now_decisions():
+    policy = EnergyPolicy(price_threshold_eur=0.5, fail_open=True)
+    assert policy.should_process_now(None) is True
+    assert policy.should_process_now(_status(0.9, True)) is True
+    assert policy.should_process_now(_status(None, False)) is True
+    assert policy.should_process_now(_status(0.4, False)) is True
+    assert policy.should_process_now(_status(0.6, False)) is False
+
+
+def test_should_process_now_fail_closed():
+    policy = EnergyPolicy(price_threshold_eur=0.5, fail_open=False)
+    assert policy.should_process_now(None) is False
+    assert policy.should_process_now(_status(None, None)) is False
+    assert policy.should_process_now(_status(None, True)) is True
@@ -0,0 +1,175 @@
+import asyncio
+import dataclasses
+
+from api import dependencies
+from energy.price_signal import EnergyStatus
+
+
+def test_energy_status_fetched_once_per_ttl(monkeypatch):
+    calls = []
+
+    def fake_fetch(url, timeout_s):
+        calls.append(url)
+        return EnergyStatus(0.5, True, 0.0)
+
+    monkeypatch.setattr(
+        dependencies,
+        "settings",
+        dataclasses.replace(
+            dependencies.settings,
+            energy_status_url="http://price-simulator",
+            energy_status_ttl=60.0,
+        ),
+    )
+    monkeypatch.setattr(dependencies, "fetch_energy_status", fake_fetch)
+    monkeypatch.setattr(dependencies, "_energy_cache", dependencies._EnergyCache())
+
+    async def burst():
+        return await asyncio.gather(
+            *(dependencies.get_energy_status() for _ in range(10))
+        )
+
+    results = asyncio.run(burst())
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_refresh_energy_status_replaces_a_fresh_value(monkeypatch):
+    prices = iter([0.5, 0.9])
+
+    def fake_fetch(url, timeout_s):
+        return EnergyStatus(next(prices), False, 0.0)
+
+    monkeypatch.setattr(
+        dependencies,
+        "settings",
+        dataclasses.replace(
+            dependencies.settings,
+            energy_status_url="http://price-simulator",
+            energy_status_ttl=60.0,
+        ),
+    )
+    monkeypatch.setattr(dependencies, "fetch_energy_status", fake_fetch)
+    monkeypatch.setattr(dependencies, "_energy_cache", dependencies._EnergyCache())
+
+    async def run():
+        first = await dependencies.get_energy_status()
+        await dependencies.refresh_energy_status()
+        return first, await dependencies.get_energy_status()
+
+    first, after = asyncio.run(run())
+
+    assert first.electricity_price_eur == 0.5
+    assert after.electricity_price_eur == 0.9
+
+
+def test_afetch_energy_status_parses_simulator_payload(monkeypatch):
+    import httpx
+
+    from energy.price_signal import afetch_energy_status
+
+    monkeypatch.delenv("ELECTRICITY_MAPS_API_KEY", raising=False)
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, json={"electricity_price_eur": "0.42", "solar_available": "1"}
+        )
+    )
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await afetch_energy_status(client, "http://price-simulator")
+
+    status = asyncio.run(fetch())
+
+    assert status.electricity_price_eur == 0.42
+    assert status.solar_available is True
+    assert status.source == "simulator"
+
+
+def test_electricity_maps_results_reused_within_ttl(monkeypatch):
+    from energy import electricity_maps
+
+    calls = []
+
+    def fake_fetch(config):
+        calls.append(config.zone)
+        return {"carbon_intensity": 120, "solar_available": True}
+
+    monkeypatch.setattr(electricity_maps, "_cache", {})
+    monkeypatch.setattr(electricity_maps, "_fetch", fake_fetch)
+
+    config = electricity_maps.ElectricityMapsConfig(api_key="k")
+    first = electricity_maps.fetch_from_electricity_maps(config)
+    first["carbon_intensity"] = 999  # callers get their own copy
+    again = electricity_maps.fetch_from_electricity_maps(config)
+    other = electricity_maps.fetch_from_electricity_maps(
+        electricity_maps.ElectricityMapsConfig(api_key="k", zone="FR")
+    )
+
+    assert again["carbon_intensity"] == 120
+    assert other is not None
+    assert calls == ["DE", "FR"]
+
+
+def test_electricity_maps_null_solar_is_not_an_error(monkeypatch):
+    from energy import electricity_maps
+
+    class Resp:
+        is_success = True
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"carbonIntensity": 120, "powerProductionBreakdown": {"solar": None}}
+
+    monkeypatch.setattr(electricity_maps._client, "get", lambda *a, **k: Resp())
+    result = electricity_maps._fetch(electricity_maps.ElectricityMapsConfig(api_key="k"))
+    assert result["carbon_intensity"] == 120
+    assert result["solar_available"] is False
+
+
+def test_electricity_maps_calls_carbon_endpoint_only_when_needed(monkeypatch):
+    from energy import electricity_maps
+
+    urls = []
+
+    class Resp:
+        is_success = True
+
+        def __init__(self, body):
+            self.body = body
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.body
+
+    def fake_get(url, **kwargs):
+        urls.append(url.rsplit("/", 2)[-2])
+        if url.endswith("/carbon-intensity/latest"):
+            return Resp({"carbonIntensity": 80})
+        return Resp(breakdown)
+
+    monkeypatch.setattr(electricity_maps._client, "get", fake_get)
+    config = electricity_maps.ElectricityMapsConfig(api_key="k")
+
+    breakdown = {"carbonIntensity": 120}
+    assert electricity_maps._fetch(config)["carbon_intensity"] == 120
+    assert urls == ["power-breakdown"]
+
+    urls.clear()
+    breakdown = {}
+    assert electricity_maps._fetch(config)["carbon_intensity"] == 80
+    assert urls == ["power-breakdown", "carbon-intensity"]
+
+
+def test_electricity_maps_malformed_ttl_falls_back(monkeypatch):
+    from energy import electricity_maps
+
+    monkeypatch.setenv("ELECTRICITY_MAPS_TTL_S", "1m")
+    assert electricity_maps._env_float("ELECTRICITY_MAPS_TTL_S", 60.0) == 60.0
+    monkeypatch.setenv("ELECTRICITY_MAPS_TTL_S", "15")
+    assert electricity_maps._env_float("ELECTRICITY_MAPS_TTL_S", 60.0) == 15.0
@@ -7,4 +7,48 @@ def test_extract_tasks(fake_provider_factory):
     client = LLMClient(provider=provider)
     tasks = client.extract_tasks("Send invoice")
     assert len(tasks) == 1
-    assert tasks[0]["title"] == "Send invoice"
\ No newline at end of file
+    assert tasks[0]["title"] == "Send invoice"
+
+def test_results_cached_only_for_providers_with_cache_id(monkeypatch):
+    import llm.llm_client as llm_client_mod
+    from llm.cache import ResponseCache
+
+    monkeypatch.setattr(llm_client_mod, "_response_cache", ResponseCache(maxsize=8))
+
+    class CountingProvider:
+        def __init__(self, cache_id=None):
+            self.calls = 0
+            if cache_id:
+                self.cache_id = cache_id
+
+        def generate(self, *, system, user, model=None):
+            self.calls += 1
+            return '{"tasks":[{"title":"Send invoice"}]}'
+
+    cached = CountingProvider(cache_id="test:backend")
+    client = LLMClient(provider=cached)
+    first = client.extract_tasks("Send invoice")
+    first[0]["title"] = "mutated by caller"
+    assert client.extract_tasks("Send invoice")[0]["title"] == "Send invoice"
+    assert cached.calls == 1
+
+    uncached = CountingProvider()
+    client = LLMClient(provider=uncached)
+    client.extract_tasks("Send invoice")
+    client.extract_tasks("Send invoice")
+    assert uncached.calls == 2
+
+
+def test_default_client_closes_provider_at_exit(monkeypatch):
+    import llm.llm_client as llm_client_mod
+
+    registered = []
+    monkeypatch.setenv("LLM_PROVIDER", "ollama")
+    monkeypatch.setattr(llm_client_mod.atexit, "register", registered.append)
+    llm_client_mod.default_client.cache_clear()
+    try:
+        client = llm_client_mod.default_client()
+        assert registered == [client.provider.close]
+    finally:
+        client.provider.close()
+        llm_client_mod.default_client.cache_clear()
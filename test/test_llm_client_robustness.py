@@ -12,4 +12,12 @@ def test_llm_invalid_json_fallback(fake_provider_factory):
     provider = fake_provider_factory("INVALID OUTPUT")
     client = LLMClient(provider=provider)
     out = client.complete("Anything")
-    assert out == '{"tasks": []}' or "tasks" in out
\ No newline at end of file
+    assert out == '{"tasks": []}' or "tasks" in out
+def test_llm_json_with_comments_and_urls(fake_provider_factory):
+    provider = fake_provider_factory(
+        'Here you go:\n{"tasks":[{"title":"Read https://example.com/post", // the link\n'
+        '"estimated_duration_min":15}]} /* done */ }'
+    )
+    client = LLMClient(provider=provider)
+    tasks = client.extract_tasks("Read the post")
+    assert tasks[0]["title"] == "Read https://example.com/post"
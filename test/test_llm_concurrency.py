@@ -0,0 +1,48 @@
+from llm.concurrency import map_bounded
+
+
+def test_map_bounded_keeps_order_retries_and_falls_back():
+    attempts = {}
+
+    def flaky(n):
+        attempts[n] = attempts.get(n, 0) + 1
+        if n == 2 and attempts[n] == 1:
+            raise RuntimeError("transient")
+        if n == 3:
+            raise RuntimeError("permanent")
+        return n * 10
+
+    out = map_bounded(flaky, [1, 2, 3, 4], fallback=lambda n: -n, backoff_s=0)
+
+    assert out == [10, 20, -3, 40]
+    assert attempts == {1: 1, 2: 2, 3: 3, 4: 1}
+
+
+def test_map_bounded_nested_calls_run_inline():
+    out = map_bounded(
+        lambda xs: map_bounded(lambda x: x + 1, xs, fallback=lambda x: None),
+        [[1, 2], [3]],
+        fallback=lambda xs: [],
+    )
+
+    assert out == [[2, 3], [4]]
+
+
+def test_classifier_splits_long_lists_into_chunks(monkeypatch):
+    import classification.task_classifier as classifier_mod
+    from planner_ai.models import Task
+
+    monkeypatch.setattr(classifier_mod, "CLASSIFY_CHUNK_SIZE", 2)
+    sizes = []
+
+    class ChunkLLM:
+        def classify_tasks(self, payload):
+            sizes.append(len(payload))
+            return [{"title": t["title"], "category": "work", "priority": 1} for t in payload]
+
+    classifier = classifier_mod.TaskClassifier(llm_client=ChunkLLM())
+    out = classifier.classify([Task(title=f"T{i}") for i in range(5)])
+
+    assert sorted(sizes) == [1, 2, 2]
+    assert [t.title for t in out] == ["T0", "T1", "T2", "T3", "T4"]
+    assert all(t.priority == 1 for t in out)
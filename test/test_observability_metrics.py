@@ -97,3 +97,24 @@ def test_metrics_queue_depth_matches_queue_endpoint() -> None:
 
     assert depth is not None, "planner_queue_depth metric not found"
     assert int(float(depth)) == int(queue_size)
+
+
+def test_unknown_label_values_collapse_to_other() -> None:
+    from prometheus_client import REGISTRY
+
+    from api.metrics import count_llm_tier
+
+    # Nothing records an unknown endpoint, so no "other" series is exported
+    assert REGISTRY.get_sample_value(
+        "planner_requests_total", {"endpoint": "other", "status": "other"}
+    ) is None
+
+    before = REGISTRY.get_sample_value(
+        "planner_llm_tier_total", {"tier": "other"}
+    ) or 0.0
+    count_llm_tier("experimental-xl")
+
+    assert REGISTRY.get_sample_value("planner_llm_tier_total", {"tier": "other"}) == before + 1
+    assert REGISTRY.get_sample_value(
+        "planner_llm_tier_total", {"tier": "experimental-xl"}
+    ) is None
@@ -15,4 +15,30 @@ def test_preferences_corrupted_file(tmp_path):
     p.write_text("{not valid json")
     store = PreferencesStore(path=str(p))
     prefs = store.load()
-    assert isinstance(prefs, UserPreferences)
\ No newline at end of file
+    assert isinstance(prefs, UserPreferences)
+def test_preferences_load_reuses_parse_until_file_changes(tmp_path, monkeypatch):
+    p = tmp_path / "prefs.json"
+    store = PreferencesStore(path=str(p))
+    store.save(UserPreferences(focus_start=time(8, 0), focus_end=time(11, 0)))
+
+    reads = []
+    real_read = type(p).read_text
+    monkeypatch.setattr(
+        type(p), "read_text", lambda self, *a, **k: reads.append(1) or real_read(self, *a, **k)
+    )
+
+    assert store.load().focus_start.hour == 8
+    assert store.load().focus_start.hour == 8
+    assert len(reads) == 1
+
+    store.save(UserPreferences(focus_start=time(10, 30), focus_end=time(12, 0)))
+    assert store.load().focus_start.hour == 10
+    assert len(reads) == 2
+
+
+def test_preferences_load_copies_nested_fields(tmp_path):
+    store = PreferencesStore(path=str(tmp_path / "prefs.json"))
+    store.save(UserPreferences())
+
+    store.load().routine.blocked_slots.append({"start": "09:00", "end": "10:00"})
+    assert store.load().routine.blocked_slots == []
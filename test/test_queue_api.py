@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.dependencies import get_durable_queue
+from storage.durable_queue import QueueItem
+
+
+def _item(item_id: str, notes: str) -> QueueItem:
+    created = datetime(2026, 1, 1, 9, 0)
+    return QueueItem(
+        id=item_id,
+        notes=notes,
+        status="pending",
+        attempts=0,
+        max_attempts=3,
+        last_error=None,
+        submitted_energy_price_eur=None,
+        submitted_solar_available=None,
+        submitted_llm_tier="small",
+        processed_energy_price_eur=None,
+        processed_solar_available=None,
+        processed_llm_tier=None,
+        created_at=created,
+        updated_at=created,
+        processing_started_at=None,
+        completed_at=None,
+        worker_id=None,
+        result=None,
+    )
+
+
+class FakeDurableQueue:
+    async def get_item_json(self, item_id: str):
+        if item_id == "missing":
+            return None
+        return '{"id": "%s", "status": "pending", "attempts": 0}' % item_id
+
+    async def get_recent_items(self, limit: int, status=None):
+        return [_item("a", "short"), _item("b", "x" * 150)][:limit]
+
+    async def iter_recent_items(self, limit: int, status=None):
+        for i in range(3):
+            yield _item(f"s{i}", "streamed")
+
+
+def test_queue_item_returns_database_json():
+    app.dependency_overrides[get_durable_queue] = lambda: FakeDurableQueue()
+    try:
+        client = TestClient(app)
+        r = client.get("/queue/items/abc")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/json")
+        assert r.json() == {"id": "abc", "status": "pending", "attempts": 0}
+
+        assert client.get("/queue/items/missing").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_queue_items_listing_truncates_notes():
+    app.dependency_overrides[get_durable_queue] = lambda: FakeDurableQueue()
+    try:
+        client = TestClient(app)
+        body = client.get("/queue/items").json()
+        assert body["count"] == 2
+        assert body["items"][0]["notes"] == "short"
+        assert body["items"][1]["notes"] == "x" * 100 + "..."
+        assert body["items"][0]["created_at"].startswith("2026-01-01T09:00:00")
+        assert body["items"][0]["completed_at"] is None
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_large_queue_listing_is_streamed():
+    app.dependency_overrides[get_durable_queue] = lambda: FakeDurableQueue()
+    try:
+        client = TestClient(app)
+        r = client.get("/queue/items", params={"limit": 1000})
+        assert r.status_code == 200
+        body = r.json()
+        assert body["count"] == 3
+        assert [i["id"] for i in body["items"]] == ["s0", "s1", "s2"]
+        assert body["items"][0]["created_at"].startswith("2026-01-01T09:00:00")
+    finally:
+        app.dependency_overrides.clear()
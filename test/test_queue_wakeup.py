@@ -0,0 +1,22 @@
+import asyncio
+import time
+
+from api import state
+
+
+def test_wait_for_queue_wakes_on_notify(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(state, "queue_cv", asyncio.Condition())
+        waiter = asyncio.create_task(state.wait_for_queue(timeout=5))
+        await asyncio.sleep(0)  # let the waiter reach the condition
+        started = time.monotonic()
+        await state.notify_queue()
+        await waiter
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 1
+
+
+def test_wait_for_queue_times_out(monkeypatch):
+    monkeypatch.setattr(state, "queue_cv", asyncio.Condition())
+    asyncio.run(state.wait_for_queue(timeout=0.01))
@@ -0,0 +1,96 @@
+from api.state import BoundedDict, Slot
+
+
+def test_bounded_dict_evicts_oldest_key():
+    d = BoundedDict(maxsize=2)
+    d["2026-01-01"] = {"slots": []}
+    d["2026-01-02"] = {"slots": []}
+    d["2026-01-01"] = {"slots": [1]}  # rewrite refreshes the key
+    d["2026-01-03"] = {"slots": []}
+    assert list(d) == ["2026-01-01", "2026-01-03"]
+
+
+def test_insert_slot_keeps_day_sorted(monkeypatch):
+    from api import state
+
+    monkeypatch.setattr(state, "recent_schedules", BoundedDict(maxsize=4))
+    state.set_day_slots(
+        "2026-01-01", [Slot("11:00", "12:00", "Lunch"), Slot("09:00", "10:00", "Gym")]
+    )
+    state.insert_slot("2026-01-01", Slot("10:00", "11:00", "Email"))
+    day = state.recent_schedules["2026-01-01"]
+    assert day["start_times"] == ["09:00", "10:00", "11:00"]
+    assert [s.start_time for s in day["slots"]] == day["start_times"]
+
+    assert state.pop_slot("2026-01-01", 0).title == "Gym"
+    assert day["start_times"] == ["10:00", "11:00"]
+
+
+def test_invalidate_events_cache_drops_overlapping_ranges(monkeypatch):
+    from api import state
+
+    monkeypatch.setattr(state, "events_cache", BoundedDict(maxsize=4))
+    state.events_cache[("default", "2026-01-01", "2026-01-07")] = (0.0, [])
+    state.events_cache[("default", "2026-01-08", "2026-01-14")] = (0.0, [])
+    state.invalidate_events_cache("2026-01-03")
+    assert list(state.events_cache) == [("default", "2026-01-08", "2026-01-14")]
+
+    state.invalidate_events_cache()
+    assert not state.events_cache
+
+
+def test_find_slot_uses_index_and_follows_moves(monkeypatch):
+    from api import state
+
+    monkeypatch.setattr(state, "task_index", {})
+    monkeypatch.setattr(
+        state, "recent_schedules", BoundedDict(maxsize=1, on_evict=state._unindex_day)
+    )
+    state.set_day_slots("2026-01-01", [Slot("09:00", "10:00", "Gym")])
+    assert state.find_slot("Gym") == ("2026-01-01", 0)
+
+    slot = state.pop_slot("2026-01-01", 0)
+    state.insert_slot("2026-01-02", slot)  # evicts 2026-01-01
+    assert state.task_index == {"Gym": "2026-01-02"}
+    assert state.find_slot("Gym") == ("2026-01-02", 0)
+    assert state.find_slot("Missing") is None
+
+    state.pop_slot("2026-01-02", 0)
+    assert "2026-01-02" not in state.recent_schedules
+
+
+def test_slot_to_dict_derives_iso_times_from_day():
+    slot = Slot("09:00", "09:30", "Gym", description="legs")
+    assert slot.to_dict("2026-01-01") == {
+        "start_time": "09:00",
+        "end_time": "09:30",
+        "start_iso": "2026-01-01T09:00:00",
+        "end_iso": "2026-01-01T09:30:00",
+        "source": "planner",
+        "task": {
+            "id": "Gym",
+            "title": "Gym",
+            "category": "work",
+            "priority": 3,
+            "estimated_duration": 30,
+            "description": "legs",
+        },
+    }
+
+
+def test_stored_days_walks_or_filters_to_the_same_days(monkeypatch):
+    from datetime import date
+
+    from api import state
+    from api.routers.tasks import _stored_days
+
+    monkeypatch.setattr(state, "recent_schedules", BoundedDict(maxsize=10))
+    for d in ("2026-01-05", "2026-01-02", "2026-02-01"):
+        state.recent_schedules[d] = {"slots": [], "start_times": []}
+
+    # Long range: filtered from the store; short range: walked day by day
+    assert _stored_days(date(2026, 1, 1), date(2026, 1, 31)) == [
+        "2026-01-02",
+        "2026-01-05",
+    ]
+    assert _stored_days(date(2026, 1, 1), date(2026, 1, 2)) == ["2026-01-02"]
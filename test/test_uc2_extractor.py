@@ -7,4 +7,29 @@ def test_uc2(fake_provider_factory):
     )
     extractor = TaskExtractor(llm_client=LLMClient(provider=provider))
     tasks = extractor.extract("Book dentist")
-    assert len(tasks) == 1
\ No newline at end of file
+    assert len(tasks) == 1
+
+def test_uc2_extract_many_single_call_with_fallback():
+    class BatchLLM:
+        def __init__(self, response):
+            self.response = response
+            self.prompts = []
+
+        def complete(self, prompt):
+            self.prompts.append(prompt)
+            if "[1]:" in prompt:
+                return self.response
+            return '{"tasks":[{"title":"Single"}]}'
+
+    llm = BatchLLM(
+        '{"tasks":[{"title":"Call mom","note_index":1},{"title":"Gym","note_index":0}]}'
+    )
+    out = TaskExtractor(llm_client=llm).extract_many(["gym", "call mom"])
+    assert [[t.title for t in tasks] for tasks in out] == [["Gym"], ["Call mom"]]
+    assert len(llm.prompts) == 1
+
+    # Tasks without a usable note_index cannot be attributed: one call per note
+    llm = BatchLLM('{"tasks":[{"title":"Gym"}]}')
+    out = TaskExtractor(llm_client=llm).extract_many(["gym", "call mom"])
+    assert [[t.title for t in tasks] for tasks in out] == [["Single"], ["Single"]]
+    assert len(llm.prompts) == 3
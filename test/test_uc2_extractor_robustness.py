@@ -15,4 +15,10 @@ def test_uc2_null_description(fake_provider_factory):
     extractor = TaskExtractor(llm_client=LLMClient(provider=provider))
     tasks = extractor.extract("Dentist")
     assert len(tasks) == 1
-    assert tasks[0].description == ""
\ No newline at end of file
+    assert tasks[0].description == ""
+def test_uc2_skips_only_the_malformed_task():
+    extractor = TaskExtractor(llm_client=object())
+    tasks = extractor._to_tasks(
+        [{"title": "Gym"}, {"title": "Bad", "priority": 42}, "junk", {"title": "Call mom"}]
+    )
+    assert [t.title for t in tasks] == ["Gym", "Call mom"]
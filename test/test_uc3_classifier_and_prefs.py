@@ -8,4 +8,17 @@ def test_uc3(fake_provider_factory):
     )
     classifier = TaskClassifier(llm_client=LLMClient(provider=provider))
     out = classifier.classify([Task(title="Task")])
-    assert out[0].priority == 1
\ No newline at end of file
+    assert out[0].priority == 1
+def test_uc3_merge_normalizes_category_and_priority():
+    classifier = TaskClassifier(llm_client=object())
+    index = {"A": Task(title="A"), "B": Task(title="B")}
+    a = classifier._merge_task(index, {"title": "A", "category": " Work ", "priority": 9})
+    b = classifier._merge_task(index, {"title": "B", "category": "errands", "priority": "two"})
+    assert (a.category, a.priority) == ("work", 5)
+    assert (b.category, b.priority) == ("errands", 3)
+
+def test_uc3_merge_reuses_unchanged_task():
+    classifier = TaskClassifier(llm_client=object())
+    base = Task(title="A", category="work", priority=2)
+    same = classifier._merge_task({"A": base}, {"title": "A", "category": "Work", "priority": 2})
+    assert same is base
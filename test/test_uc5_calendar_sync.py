@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
+
+import pytest
 from planner_ai.models import ScheduledTask
 from integration.calendar_integration import CalendarIntegration
 
@@ -6,4 +8,216 @@ def test_uc5_noop():
     cal = CalendarIntegration(credentials=None)
     tasks = [ScheduledTask(title="X", start_time=datetime(2026,1,1,9,0), end_time=datetime(2026,1,1,9,30))]
     out = cal.sync(tasks)
-    assert out[0].calendar_event_id is None
\ No newline at end of file
+    assert out[0].calendar_event_id is None
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        self._service.batch_sizes.append(len(self._requests))
+        for request_id, (method, body) in self._requests:
+            self._callback(request_id, {"id": f"{method}-{body['summary']}"}, None)
+
+
+class _FakeEvents:
+    def __init__(self, items):
+        self._items = items
+
+    def list(self, **kwargs):
+        return _FakeRequest({"items": self._items})
+
+    def insert(self, calendarId, body):
+        return ("insert", body)
+
+    def update(self, calendarId, eventId, body):
+        return ("update", body)
+
+
+class _FakeRequest:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self, num_retries=0):
+        return self._result
+
+
+class _FakeService:
+    def __init__(self, items=()):
+        self.batch_sizes = []
+        self.items = list(items)
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def events(self):
+        return _FakeEvents(self.items)
+
+    def calendars(self):
+        raise RuntimeError("no timezone lookup in tests")
+
+
+def test_uc5_sync_batches_requests():
+    cal = CalendarIntegration(credentials=object())
+    cal._service = _FakeService()
+    tasks = [
+        ScheduledTask(
+            title=f"T{i}",
+            start_time=datetime(2026, 1, 1, 9, 0),
+            end_time=datetime(2026, 1, 1, 9, 30),
+            calendar_event_id="existing" if i == 0 else None,
+        )
+        for i in range(60)
+    ]
+
+    out = cal.sync(tasks)
+
+    assert cal._service.batch_sizes == [50, 10]
+    assert out[0].calendar_event_id == "update-T0"
+    assert out[59].calendar_event_id == "insert-T59"
+
+
+def test_uc5_sync_skips_events_already_in_calendar():
+    cal = CalendarIntegration(credentials=object())
+    cal._service = _FakeService(
+        items=[
+            {
+                "id": "evt-1",
+                "summary": "Standup",
+                "start": {"dateTime": "2026-01-01T09:00:00+01:00"},
+                "end": {"dateTime": "2026-01-01T09:30:00+01:00"},
+            }
+        ]
+    )
+    tasks = [
+        ScheduledTask(
+            title=title,
+            start_time=datetime(2026, 1, 1, 9, 0),
+            end_time=datetime(2026, 1, 1, 9, 30),
+        )
+        for title in ("Standup", "Review")
+    ]
+
+    out = cal.sync(tasks)
+
+    assert cal._service.batch_sizes == [1]
+    assert out[0].calendar_event_id == "evt-1"
+    assert out[1].calendar_event_id == "insert-Review"
+
+
+def test_uc5_sync_returns_rate_limited_requests_for_retry():
+    class RateLimited(Exception):
+        class resp:
+            status = 429
+
+    class FlakyBatch(_FakeBatch):
+        def execute(self):
+            self._service.batch_sizes.append(len(self._requests))
+            for request_id, (method, body) in self._requests:
+                if body["summary"] == "T1":
+                    self._callback(request_id, None, RateLimited())
+                else:
+                    self._callback(request_id, {"id": f"{method}-{body['summary']}"}, None)
+
+    service = _FakeService()
+    service.new_batch_http_request = lambda callback: FlakyBatch(service, callback)
+    cal = CalendarIntegration(credentials=object())
+    cal._service = service
+    tasks = [
+        ScheduledTask(title=f"T{i}", start_time=datetime(2026, 1, 1, 9, 0), end_time=datetime(2026, 1, 1, 9, 30))
+        for i in range(3)
+    ]
+
+    result = cal.try_sync(tasks)
+
+    # No in-place retry: the worker resends later, outside the lock
+    assert service.batch_sizes == [3]
+    assert [t.calendar_event_id for t in result.tasks] == ["insert-T0", None, "insert-T2"]
+    assert result.retry == [tasks[1]]
+    assert not cal._lock.locked()
+
+
+def test_uc5_try_sync_reports_transient_failures():
+    class ServerError(Exception):
+        class resp:
+            status = 503
+
+    class NotFound(Exception):
+        class resp:
+            status = 404
+
+    class FailingBatch(_FakeBatch):
+        def execute(self):
+            for request_id, (method, body) in self._requests:
+                error = {"T1": ServerError(), "T2": NotFound()}.get(body["summary"])
+                response = None if error else {"id": f"{method}-{body['summary']}"}
+                self._callback(request_id, response, error)
+
+    service = _FakeService()
+    service.new_batch_http_request = lambda callback: FailingBatch(service, callback)
+    cal = CalendarIntegration(credentials=object())
+    cal._service = service
+    tasks = [
+        ScheduledTask(title=f"T{i}", start_time=datetime(2026, 1, 1, 9, 0), end_time=datetime(2026, 1, 1, 9, 30))
+        for i in range(3)
+    ]
+
+    result = cal.try_sync(tasks)
+
+    assert [t.calendar_event_id for t in result.tasks] == ["insert-T0", None, None]
+    assert result.retry == [tasks[1]]
+
+
+def test_uc5_calendar_timezone_fetched_once():
+    lookups = []
+
+    class Calendars:
+        def get(self, calendarId):
+            lookups.append(calendarId)
+            return _FakeRequest({"timeZone": "Europe/Vienna"})
+
+    service = _FakeService()
+    service.calendars = Calendars
+    cal = CalendarIntegration(credentials=object())
+
+    assert cal._get_calendar_timezone(service) == "Europe/Vienna"
+    assert cal._get_calendar_timezone(service) == "Europe/Vienna"
+    assert lookups == ["primary"]
+
+    cal.invalidate_timezone_cache()
+    cal._get_calendar_timezone(service)
+    assert lookups == ["primary", "primary"]
+
+
+def test_uc5_get_events_follows_pages_with_field_mask():
+    calls = []
+
+    class PagedEvents:
+        def list(self, **kwargs):
+            calls.append(kwargs)
+            if kwargs["pageToken"] is None:
+                return _FakeRequest({"items": [{"id": "a"}], "nextPageToken": "p2"})
+            return _FakeRequest({"items": [{"id": "b"}]})
+
+    service = _FakeService()
+    service.events = PagedEvents
+    cal = CalendarIntegration(credentials=object())
+    cal._service = service
+
+    events = cal.get_events(
+        datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2026, 1, 2, tzinfo=timezone.utc)
+    )
+
+    assert [e["id"] for e in events] == ["a", "b"]
+    assert calls[1]["pageToken"] == "p2"
+    assert "nextPageToken" in calls[0]["fields"]
+    assert calls[0]["singleEvents"] is True
+    assert calls[0]["timeMin"] == "2026-01-01T00:00:00Z"
+
+    with pytest.raises(ValueError):
+        cal.get_events(datetime(2026, 1, 1), datetime(2026, 1, 2))